@@ -3,7 +3,10 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Dict
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 
 def build_case_studies(
@@ -20,24 +23,34 @@ def build_case_studies(
     heat_events = heat_df.dropna(subset=["heat_event_id"]).copy()
     event_summary = events_df.copy()
     event_summary = event_summary.sort_values(["species", "max_temp_c"], ascending=[True, False])
-    top_events = event_summary.groupby("species").head(top_n)
+    top_events = event_summary.groupby("species", observed=True).head(top_n)
 
-    cluster_lookup = clusters_df.set_index("cluster_id")["is_refugia"].to_dict() if not clusters_df.empty else {}
+    # Dense lookup indexed by cluster id; noise (-1) and unknown ids fall outside it and count as misses.
+    refugia_lookup = np.zeros(0, dtype=bool)
+    if not clusters_df.empty:
+        known_ids = clusters_df["cluster_id"].to_numpy(dtype=np.int64)
+        refugia_lookup = np.zeros(known_ids.max() + 1, dtype=bool)
+        refugia_lookup[known_ids] = clusters_df["is_refugia"].to_numpy(dtype=bool)
+    subset_by_event = dict(tuple(heat_events.groupby("heat_event_id")))
 
     rows = []
-    for _, event in top_events.iterrows():
-        subset = heat_events[heat_events["heat_event_id"] == event["heat_event_id"]]
-        cluster_ids = sorted(set(subset["cluster_id"].dropna().astype(int)))
-        refugia_hits = sum(cluster_lookup.get(cid, False) for cid in cluster_ids)
+    for event in top_events.itertuples(index=False):
+        subset = subset_by_event.get(event.heat_event_id)
+        if subset is None:
+            cluster_ids = np.zeros(0, dtype=np.int64)
+        else:
+            cluster_ids = np.unique(subset["cluster_id"].dropna().to_numpy(dtype=np.int64))
+        in_lookup = cluster_ids[(cluster_ids >= 0) & (cluster_ids < refugia_lookup.size)]
+        refugia_hits = int(refugia_lookup[in_lookup].sum())
         rows.append({
-            "species": event["species"],
-            "heat_event_id": int(event["heat_event_id"]),
-            "start_time": event["start_time"],
-            "end_time": event["end_time"],
-            "duration_hours": event["duration_hours"],
-            "mean_temp_c": event["mean_temp_c"],
-            "max_temp_c": event["max_temp_c"],
-            "num_points": event["num_points"],
+            "species": event.species,
+            "heat_event_id": int(event.heat_event_id),
+            "start_time": event.start_time,
+            "end_time": event.end_time,
+            "duration_hours": event.duration_hours,
+            "mean_temp_c": event.mean_temp_c,
+            "max_temp_c": event.max_temp_c,
+            "num_points": event.num_points,
             "cluster_ids": ",".join(str(cid) for cid in cluster_ids),
             "refugia_clusters_hit": refugia_hits,
         })
@@ -45,17 +58,25 @@ def build_case_studies(
     case_df = pd.DataFrame(rows)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     if output_path.suffix.lower() == ".csv":
-        case_df.to_csv(output_path, index=False)
+        pacsv.write_csv(pa.Table.from_pandas(case_df, preserve_index=False), output_path)
     else:
         lines = ["# Case Studies", ""]
-        for species, group in case_df.groupby("species"):
+        for species, group in case_df.groupby("species", observed=True):
             lines.append(f"## {species}")
-            for _, row in group.iterrows():
-                lines.append(
-                    f"- Event {row['heat_event_id']} ({row['start_time']} to {row['end_time']}) | "
-                    f"max {row['max_temp_c']:.2f} C | duration {row['duration_hours']:.1f} h | "
-                    f"clusters {row['cluster_ids']} | refugia hits {row['refugia_clusters_hit']}"
+            lines.extend(
+                f"- Event {event_id} ({start} to {end}) | "
+                f"max {max_temp:.2f} C | duration {duration:.1f} h | "
+                f"clusters {cluster_ids} | refugia hits {hits}"
+                for event_id, start, end, max_temp, duration, cluster_ids, hits in zip(
+                    group["heat_event_id"],
+                    group["start_time"],
+                    group["end_time"],
+                    group["max_temp_c"].to_numpy(),
+                    group["duration_hours"].to_numpy(),
+                    group["cluster_ids"],
+                    group["refugia_clusters_hit"],
                 )
+            )
             lines.append("")
         output_path.write_text("\n".join(lines))
     return output_path
@@ -9,23 +9,38 @@ from sklearn.cluster import DBSCAN
 from .utils import EARTH_RADIUS_KM
 
 
+def _sorted_unique_lists(df: pd.DataFrame, column: str) -> pd.Series:
+    pairs = df[["cluster_id", column]].drop_duplicates().sort_values(["cluster_id", column])
+    return pairs.groupby("cluster_id")[column].agg(list)
+
+
 def cluster_refugia(
     heat_df: pd.DataFrame,
     eps_km: float,
     min_samples: int,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    df = heat_df.copy()
-    events = df.dropna(subset=["heat_event_id"]).copy()
+    df = heat_df.copy(deep=False)
+    in_event = df["heat_event_id"].notna().to_numpy()
+    events = df[in_event]
     if events.empty:
         return df, pd.DataFrame()
 
-    coords = np.radians(events[["lat", "lon"]].to_numpy())
-    clustering = DBSCAN(eps=eps_km / EARTH_RADIUS_KM, min_samples=min_samples, metric="haversine")
+    coords = np.radians(events[["lat", "lon"]].to_numpy(dtype=np.float64))
+    clustering = DBSCAN(
+        eps=eps_km / EARTH_RADIUS_KM,
+        min_samples=min_samples,
+        metric="haversine",
+        algorithm="ball_tree",
+        n_jobs=-1,
+    )
     labels = clustering.fit_predict(coords)
-    events["cluster_id"] = labels
-    df.loc[events.index, "cluster_id"] = labels
+    # Replace the whole column so the shallow copy never writes into the caller's arrays.
+    cluster_id = np.full(len(df), np.nan)
+    cluster_id[in_event] = labels
+    df["cluster_id"] = cluster_id
 
-    clusters = events[events["cluster_id"] >= 0].copy()
+    clustered = labels >= 0
+    clusters = events[clustered].assign(cluster_id=labels[clustered])
     if clusters.empty:
         return df, pd.DataFrame()
 
@@ -38,10 +53,14 @@ def cluster_refugia(
         num_events=("heat_event_id", "nunique"),
         first_seen=("timestamp", "min"),
         last_seen=("timestamp", "max"),
-        years=("year", lambda x: sorted(set(x))),
-        species_list=("species", lambda x: sorted(set(x))),
-        dominant_species=("species", lambda x: x.value_counts().idxmax()),
-    ).reset_index()
+    )
+    summary["years"] = _sorted_unique_lists(clusters, "year")
+    summary["species_list"] = _sorted_unique_lists(clusters, "species")
+    species_counts = clusters.groupby(["cluster_id", "species"], sort=False, observed=True).size().reset_index(name="count")
+    # Stable sort keeps first-seen species ahead on ties, matching value_counts().idxmax().
+    species_counts = species_counts.sort_values("count", ascending=False, kind="stable")
+    summary["dominant_species"] = species_counts.drop_duplicates("cluster_id").set_index("cluster_id")["species"]
+    summary = summary.reset_index()
 
     summary["is_refugia"] = (summary["num_individuals"] >= 2) & (summary["num_events"] >= 2)
     return df, summary
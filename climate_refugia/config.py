@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict
 
+import pandas as pd
+
 
 @dataclass
 class PipelineConfig:
@@ -16,8 +18,12 @@ class PipelineConfig:
     model_random_state: int = 42
     model_n_estimators: int = 300
     model_max_depth: int = 12
+    model_backend: str = "sklearn"
+    model_n_jobs: int = -1
     time_tolerance_minutes: int = 60
     auto_threshold_quantile: float = 0.9
+    use_polars: bool = False
+    aligned_tile_deg: float = 1.0
 
     @staticmethod
     def default() -> "PipelineConfig":
@@ -31,10 +37,7 @@ class PipelineConfig:
         thresholds_path = self.data_dir / "species_thresholds.csv"
         if not thresholds_path.exists():
             return {}
-        thresholds: Dict[str, float] = {}
-        for line in thresholds_path.read_text().splitlines()[1:]:
-            if not line.strip():
-                continue
-            species, value = line.split(",")
-            thresholds[species.strip()] = float(value.strip())
-        return thresholds
+        df = pd.read_csv(thresholds_path, skipinitialspace=True)
+        species = df.iloc[:, 0].astype(str).str.strip()
+        values = df.iloc[:, 1].astype(float)
+        return dict(zip(species, values))
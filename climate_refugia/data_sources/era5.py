@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import shutil
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
+from typing import Iterable, Iterator, List, Optional, Sequence
 
 import numpy as np
 import pandas as pd
@@ -16,6 +18,21 @@ try:
 except ImportError:  # pragma: no cover
     cdsapi = None
 
+try:
+    import dask
+except ImportError:  # pragma: no cover
+    dask = None
+
+try:
+    import numexpr
+except ImportError:  # pragma: no cover
+    numexpr = None
+
+# ERA5 files are hourly; week-long time chunks keep lazily loaded arrays bounded in memory.
+_ERA5_CHUNKS = {"time": 168, "valid_time": 168}
+
+_RH_EXPRESSION = "100.0 * exp(a * (dk - 273.15) / (dk - 273.15 + b) - a * (tk - 273.15) / (tk - 273.15 + b))"
+
 
 @dataclass
 class Era5Request:
@@ -32,9 +49,10 @@ def download_era5(request: Era5Request) -> Path:
         raise RuntimeError("cdsapi is required for ERA5 downloads")
 
     client = cdsapi.Client()
-    years = sorted({str(ts.year) for ts in pd.date_range(request.start, request.end, freq="D")})
-    months = sorted({f"{ts.month:02d}" for ts in pd.date_range(request.start, request.end, freq="D")})
-    days = sorted({f"{ts.day:02d}" for ts in pd.date_range(request.start, request.end, freq="D")})
+    dates = pd.date_range(request.start, request.end, freq="D")
+    years = [str(year) for year in np.unique(dates.year)]
+    months = [f"{month:02d}" for month in np.unique(dates.month)]
+    days = [f"{day:02d}" for day in np.unique(dates.day)]
     hours = [f"{hour:02d}:00" for hour in range(24)]
 
     request.output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -58,13 +76,16 @@ def download_era5(request: Era5Request) -> Path:
 
 
 def relative_humidity_from_dewpoint(temp_k: np.ndarray, dewpoint_k: np.ndarray) -> np.ndarray:
-    temp_c = temp_k - 273.15
-    dew_c = dewpoint_k - 273.15
     a = 17.625
     b = 243.04
-    svp = 6.1094 * np.exp((a * temp_c) / (temp_c + b))
-    avp = 6.1094 * np.exp((a * dew_c) / (dew_c + b))
-    rh = 100.0 * (avp / svp)
+    # The 6.1094 hPa prefactor cancels in avp / svp, leaving a single exponential.
+    if numexpr is not None:
+        rh = numexpr.evaluate(_RH_EXPRESSION, local_dict={"tk": temp_k, "dk": dewpoint_k, "a": a, "b": b})
+        rh = rh.astype(np.result_type(temp_k, dewpoint_k, np.float32), copy=False)
+    else:
+        temp_c = temp_k - 273.15
+        dew_c = dewpoint_k - 273.15
+        rh = 100.0 * np.exp((a * dew_c) / (dew_c + b) - (a * temp_c) / (temp_c + b))
     return np.clip(rh, 0.0, 100.0)
 
 
@@ -83,41 +104,86 @@ def _is_zip(path: Path) -> bool:
         return False
 
 
-def _open_era5_dataset(path: Path) -> xr.Dataset:
-    if _is_zip(path):
-        with zipfile.ZipFile(path) as zf:
-            nc_files = [name for name in zf.namelist() if name.endswith(".nc")]
-            if not nc_files:
-                raise ValueError("ERA5 zip archive contains no NetCDF files")
-            with tempfile.TemporaryDirectory() as tmpdir:
-                extracted = []
-                for name in nc_files:
-                    extracted_path = Path(tmpdir) / Path(name).name
-                    with zf.open(name) as src, extracted_path.open("wb") as dst:
-                        dst.write(src.read())
-                    extracted.append(extracted_path)
-                datasets = []
-                for item in extracted:
-                    ds = xr.open_dataset(item)
-                    datasets.append(ds.load())
-                combined = xr.combine_by_coords(datasets, combine_attrs="drop_conflicts")
-                for ds in datasets:
-                    ds.close()
-                return combined
-    return xr.open_dataset(path)
-
-
-def era5_to_dataframe(path: Path) -> pd.DataFrame:
-    ds = _open_era5_dataset(path)
-
-    temp_key = _resolve_var(ds, ["t2m", "2m_temperature", "temperature_2m"])
-    dew_key = _resolve_var(ds, ["d2m", "2m_dewpoint_temperature", "dewpoint_2m"])
-    precip_key = _resolve_var(ds, ["tp", "total_precipitation"])
-
-    if temp_key is None:
-        raise ValueError("ERA5 dataset missing 2m temperature")
-
-    df = ds.to_dataframe().reset_index()
+def _open_multi_dataset(paths: List[Path]) -> xr.Dataset:
+    if dask is not None:
+        return xr.open_mfdataset(
+            [str(item) for item in paths],
+            combine="by_coords",
+            parallel=True,
+            chunks="auto",
+            combine_attrs="drop_conflicts",
+        )
+    datasets = []
+    for item in paths:
+        with xr.open_dataset(item) as ds:
+            datasets.append(ds.load())
+    return xr.combine_by_coords(datasets, combine_attrs="drop_conflicts")
+
+
+@contextmanager
+def _open_era5_dataset(path: Path) -> Iterator[xr.Dataset]:
+    if path.is_dir():
+        nc_files = sorted(path.glob("*.nc"))
+        if not nc_files:
+            raise ValueError(f"No NetCDF files found in {path}")
+        with _open_multi_dataset(nc_files) as combined:
+            yield combined
+        return
+
+    if not _is_zip(path):
+        with xr.open_dataset(path, chunks=_ERA5_CHUNKS if dask is not None else None) as ds:
+            yield ds
+        return
+
+    with zipfile.ZipFile(path) as zf:
+        nc_files = [name for name in zf.namelist() if name.endswith(".nc")]
+        if not nc_files:
+            raise ValueError("ERA5 zip archive contains no NetCDF files")
+        # The extracted files back the lazily loaded dataset, so they must outlive the caller's use of it.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            extracted = []
+            for name in nc_files:
+                extracted_path = Path(tmpdir) / Path(name).name
+                with zf.open(name) as src, extracted_path.open("wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                extracted.append(extracted_path)
+            with _open_multi_dataset(extracted) as combined:
+                yield combined
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[pd.Timestamp]:
+    if value is None:
+        return None
+    stamp = pd.Timestamp(value)
+    return stamp.tz_convert(None) if stamp.tzinfo is not None else stamp
+
+
+def era5_to_dataframe(
+    path: Path,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> pd.DataFrame:
+    with _open_era5_dataset(path) as ds:
+        temp_key = _resolve_var(ds, ["t2m", "2m_temperature", "temperature_2m"])
+        dew_key = _resolve_var(ds, ["d2m", "2m_dewpoint_temperature", "dewpoint_2m"])
+        precip_key = _resolve_var(ds, ["tp", "total_precipitation"])
+
+        if temp_key is None:
+            raise ValueError("ERA5 dataset missing 2m temperature")
+
+        keys = [key for key in (temp_key, dew_key, precip_key) if key is not None]
+        # Subset variables and time while still lazy so only the needed slab is read from disk.
+        subset = ds[keys]
+        time_dim = _resolve_var(subset, ["time", "valid_time"])
+        if time_dim is not None and (start is not None or end is not None):
+            subset = subset.sel({time_dim: slice(_naive_utc(start), _naive_utc(end))})
+        arrays = xr.broadcast(*(subset[key] for key in keys))
+        dims = list(arrays[0].dims)
+        grids = np.meshgrid(*(arrays[0][dim].to_numpy() for dim in dims), indexing="ij")
+        columns = {dim: grid.ravel() for dim, grid in zip(dims, grids)}
+        for key, array in zip(keys, arrays):
+            columns[key] = array.transpose(*dims).to_numpy().ravel()
+        df = pd.DataFrame(columns)
 
     time_col = "time"
     if "time" not in df.columns:
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import requests
 
+from ..utils import ensure_categorical, write_parquet_table
+
 MOVE_BANK_URL = "https://www.movebank.org/movebank/service/direct-read"
 
 DEFAULT_ATTRIBUTES = [
@@ -18,6 +28,37 @@ DEFAULT_ATTRIBUTES = [
     "sensor_type_id",
 ]
 
+MOVEBANK_COLUMN_MAP = {
+    "location_lat": "lat",
+    "location_long": "lon",
+    "latitude": "lat",
+    "longitude": "lon",
+    "timestamp": "timestamp",
+    "individual_id": "individual_id",
+    "individual_local_identifier": "individual_name",
+    "taxon_canonical_name": "species",
+    "tag_id": "tag_id",
+}
+
+# Files already in the pipeline's column names (e.g. the combined download bundle) keep these as-is.
+MOVEBANK_NORMALIZED_COLUMNS = ["lat", "lon", "individual_name", "species", "study_id", "study_name", "speed_mps"]
+
+# Typed up front so Arrow skips inference on the large numeric columns. Id columns stay inferred:
+# some studies use alphanumeric individual and tag ids.
+MOVEBANK_COLUMN_TYPES = {
+    "location_lat": pa.float64(),
+    "location_long": pa.float64(),
+    "latitude": pa.float64(),
+    "longitude": pa.float64(),
+    "lat": pa.float64(),
+    "lon": pa.float64(),
+}
+
+STUDY_NUMERIC_COLUMNS = ["number_of_individuals", "main_location_lat", "main_location_long"]
+
+STUDY_CACHE_TTL = timedelta(hours=24)
+STUDY_CACHE_USER_KEY = b"movebank_username"
+
 
 class MovebankError(RuntimeError):
     """Movebank API error."""
@@ -55,59 +96,133 @@ def download_movebank_events(
     if extra_params:
         params.update(extra_params)
 
-    response = requests.get(MOVE_BANK_URL, params=params, auth=(username, password), timeout=120)
-    if response.status_code != 200:
-        raise MovebankError(f"Movebank request failed: {response.status_code} {response.text[:200]}")
-
-    content = response.content
-    text_head = content[:200].decode("utf-8", errors="ignore").lower()
-    if "<html" in text_head or "by accepting this document the user agrees" in text_head:
-        raise MovebankError(
-            "Movebank license terms not accepted for this study. "
-            "Log in to Movebank, accept the license terms for the study, then retry."
+    with requests.get(
+        MOVE_BANK_URL,
+        params=params,
+        auth=(username, password),
+        timeout=120,
+        stream=True,
+    ) as response:
+        if response.status_code != 200:
+            raise MovebankError(f"Movebank request failed: {response.status_code} {response.text[:200]}")
+
+        response.raw.decode_content = True
+        head = response.raw.read(200)
+        text_head = head.decode("utf-8", errors="ignore").lower()
+        if "<html" in text_head or "by accepting this document the user agrees" in text_head:
+            raise MovebankError(
+                "Movebank license terms not accepted for this study. "
+                "Log in to Movebank, accept the license terms for the study, then retry."
+            )
+
+        # Stream into a sibling temp file and move it into place only once complete, so an interrupted
+        # transfer never leaves a truncated CSV that later runs would treat as already downloaded.
+        handle = tempfile.NamedTemporaryFile(
+            "wb", dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part", delete=False
         )
-
-    output_path.write_bytes(content)
+        try:
+            with handle:
+                handle.write(head)
+                shutil.copyfileobj(response.raw, handle)
+            os.replace(handle.name, output_path)
+        except BaseException:
+            Path(handle.name).unlink(missing_ok=True)
+            raise
     return output_path
 
 
+def read_movebank_studies(source) -> pd.DataFrame:
+    """Parse a Movebank study catalog CSV from a path or binary stream."""
+    table = pacsv.read_csv(source, convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+    studies = table.to_pandas()
+    # The catalog is user-entered; a stray value must become NaN rather than fail the whole parse.
+    for column in STUDY_NUMERIC_COLUMNS:
+        if column in studies.columns:
+            studies[column] = pd.to_numeric(studies[column], errors="coerce")
+    return studies
+
+
+def fetch_movebank_studies(username: str, password: str) -> pd.DataFrame:
+    with requests.get(
+        MOVE_BANK_URL,
+        params={"entity_type": "study", "format": "csv"},
+        auth=(username, password),
+        timeout=120,
+        stream=True,
+    ) as response:
+        response.raise_for_status()
+        # Parse straight off the socket instead of buffering the catalog as text first.
+        response.raw.decode_content = True
+        return read_movebank_studies(response.raw)
+
+
+def _studies_cache_owner(cache_path: Path) -> Optional[bytes]:
+    return (pq.read_schema(cache_path).metadata or {}).get(STUDY_CACHE_USER_KEY)
+
+
+def fetch_movebank_studies_cached(
+    username: str,
+    password: str,
+    cache_path: Path,
+    ttl: timedelta = STUDY_CACHE_TTL,
+) -> pd.DataFrame:
+    # The catalog changes rarely, so repeated runs within the TTL reuse the last download. It only lists
+    # what the account can see, so a cache written for another username is fetched again.
+    if (
+        cache_path.exists()
+        and time.time() - cache_path.stat().st_mtime < ttl.total_seconds()
+        and _studies_cache_owner(cache_path) == username.encode()
+    ):
+        return pd.read_parquet(cache_path, engine="pyarrow")
+    studies = fetch_movebank_studies(username, password)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(studies, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, STUDY_CACHE_USER_KEY: username.encode()})
+    write_parquet_table(table, cache_path)
+    return studies
+
+
 def load_movebank_csv(
     path: Path,
     require_species: bool = True,
     species_fallback: str | None = None,
 ) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    column_map = {
-        "location_lat": "lat",
-        "location_long": "lon",
-        "latitude": "lat",
-        "longitude": "lon",
-        "timestamp": "timestamp",
-        "individual_id": "individual_id",
-        "individual_local_identifier": "individual_name",
-        "taxon_canonical_name": "species",
-        "tag_id": "tag_id",
-    }
-
-    rename = {}
-    for column in df.columns:
-        if column in column_map:
-            rename[column] = column_map[column]
-    df = df.rename(columns=rename)
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [column for column in header if column in MOVEBANK_COLUMN_MAP or column in MOVEBANK_NORMALIZED_COLUMNS]
+    rename = {column: MOVEBANK_COLUMN_MAP.get(column, column) for column in usecols}
 
     required = {"timestamp", "lat", "lon"}
-    if not required.issubset(df.columns):
-        missing = required - set(df.columns)
+    if not required.issubset(rename.values()):
+        missing = required - set(rename.values())
         raise MovebankError(f"Missing required columns in Movebank data: {sorted(missing)}")
 
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 22),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=usecols,
+            column_types={column: value for column, value in MOVEBANK_COLUMN_TYPES.items() if column in usecols},
+            strings_can_be_null=True,
+        ),
+    )
+    # Entirely empty columns have Arrow's null type; read them as float NaN like pandas does.
+    table = table.cast(pa.schema([
+        field.with_type(pa.float64()) if pa.types.is_null(field.type) else field for field in table.schema
+    ]))
+    df = table.to_pandas().rename(columns=rename)
+
+    # Arrow parses offset timestamps itself, at second resolution; keep the nanosecond unit pandas used.
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce").dt.as_unit("ns")
     if "species" not in df.columns:
         if require_species and not species_fallback:
             raise MovebankError("Species column missing; ensure taxon_canonical_name is included in attributes.")
         df["species"] = species_fallback if species_fallback else "Unknown"
     if "individual_id" not in df.columns:
         if "individual_name" in df.columns:
-            df["individual_id"] = df["individual_name"].astype(str)
+            # Arrow yields None for missing strings; NaN keeps the "nan" id pd.read_csv produced.
+            df["individual_id"] = df["individual_name"].fillna(float("nan")).astype(str)
         else:
             raise MovebankError("individual_id or individual_local_identifier is required in Movebank data.")
+    df["species"] = ensure_categorical(df["species"])
+    df["individual_id"] = ensure_categorical(df["individual_id"])
     return df
@@ -6,8 +6,8 @@ import numpy as np
 import pandas as pd
 
 from .clustering import cluster_refugia
-from .heat_events import detect_heat_events
-from .utils import haversine_km
+from .heat_events import assign_heat_events, prepare_heat_frame
+from .utils import haversine_km_vec
 
 
 def heatwave_response_analysis(
@@ -16,9 +16,12 @@ def heatwave_response_analysis(
     eps_km: float,
     min_samples: int,
 ) -> pd.DataFrame:
+    subsets_by_year = dict(tuple(heat_df.groupby(heat_df["timestamp"].dt.year, sort=False)))
     results = []
     for year in years:
-        subset = heat_df[heat_df["timestamp"].dt.year == year]
+        subset = subsets_by_year.get(year)
+        if subset is None:
+            continue
         _, clusters = cluster_refugia(subset, eps_km=eps_km, min_samples=min_samples)
         clusters["year"] = year
         results.append(clusters)
@@ -49,12 +52,24 @@ def climate_scenario_shift(
     if merged.empty:
         return merged
 
-    merged["shift_km"] = merged.apply(
-        lambda row: haversine_km(row["lat_a"], row["lon_a"], row["lat_b"], row["lon_b"]), axis=1
+    merged["shift_km"] = haversine_km_vec(
+        merged["lat_a"].to_numpy(),
+        merged["lon_a"].to_numpy(),
+        merged["lat_b"].to_numpy(),
+        merged["lon_b"].to_numpy(),
     )
     return merged
 
 
+def _coordinate_keys(df: pd.DataFrame, decimals: int = 4) -> np.ndarray:
+    """Pack (lat, lon) rounded to ``decimals`` places into a single int64 key."""
+    scale = 10**decimals
+    coords = df[["lat", "lon"]].dropna()
+    lat = np.rint(coords["lat"].to_numpy() * scale).astype(np.int64) + 90 * scale
+    lon = np.rint(coords["lon"].to_numpy() * scale).astype(np.int64) + 180 * scale
+    return lat * (360 * scale + 1) + lon
+
+
 def model_comparison_empirical_vs_climate(
     heat_df: pd.DataFrame,
     top_cool_percentile: float = 0.1,
@@ -72,10 +87,10 @@ def model_comparison_empirical_vs_climate(
     if climate_refugia.empty or empirical_refugia.empty:
         return {"overlap_rate": float("nan")}
 
-    climate_points = set(zip(climate_refugia["lat"].round(4), climate_refugia["lon"].round(4)))
-    empirical_points = set(zip(empirical_refugia["lat"].round(4), empirical_refugia["lon"].round(4)))
-    overlap = climate_points.intersection(empirical_points)
-    overlap_rate = len(overlap) / max(1, len(empirical_points))
+    climate_points = np.unique(_coordinate_keys(climate_refugia))
+    empirical_points = np.unique(_coordinate_keys(empirical_refugia))
+    overlap = np.intersect1d(climate_points, empirical_points, assume_unique=True)
+    overlap_rate = overlap.size / max(1, empirical_points.size)
     return {"overlap_rate": float(overlap_rate)}
 
 
@@ -88,20 +103,25 @@ def sensitivity_analysis(
     min_samples: int,
     heat_window_hours: int = 3,
 ) -> pd.DataFrame:
+    prepared_df, individual_codes, min_points = prepare_heat_frame(
+        aligned_df,
+        thresholds,
+        default_threshold,
+        heat_window_hours,
+    )
     results = []
+    previous_event_ids = None
+    counts = {"num_clusters": 0, "num_refugia": 0}
     for delta in deltas:
-        adjusted = {species: value + delta for species, value in thresholds.items()}
-        temp_threshold = default_threshold + delta
-        heat_df, _ = detect_heat_events(
-            aligned_df,
-            thresholds=adjusted,
-            default_threshold=temp_threshold,
-            heat_window_hours=heat_window_hours,
-        )
-        _, clusters = cluster_refugia(heat_df, eps_km=eps_km, min_samples=min_samples)
-        results.append({
-            "delta_c": delta,
-            "num_clusters": int(clusters["cluster_id"].nunique()) if not clusters.empty else 0,
-            "num_refugia": int(clusters["is_refugia"].sum()) if not clusters.empty else 0,
-        })
+        heat_df, _ = assign_heat_events(prepared_df, individual_codes, min_points, threshold_offset=delta)
+        event_ids = heat_df["heat_event_id"].to_numpy(dtype=np.int64, na_value=0)
+        # Clustering depends only on which points belong to which event, so unchanged labels reuse the counts.
+        if previous_event_ids is None or not np.array_equal(event_ids, previous_event_ids):
+            _, clusters = cluster_refugia(heat_df, eps_km=eps_km, min_samples=min_samples)
+            counts = {
+                "num_clusters": int(clusters["cluster_id"].nunique()) if not clusters.empty else 0,
+                "num_refugia": int(clusters["is_refugia"].sum()) if not clusters.empty else 0,
+            }
+            previous_event_ids = event_ids
+        results.append({"delta_c": delta, **counts})
     return pd.DataFrame(results)
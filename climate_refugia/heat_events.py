@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import math
 from typing import Dict, Tuple
 
 import numpy as np
@@ -8,53 +7,138 @@ import pandas as pd
 
 from .utils import ensure_datetime
 
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None
 
-def detect_heat_events(
+
+def _label_heat_blocks_loop(
+    individual_codes: np.ndarray,
+    exposure: np.ndarray,
+    min_points: np.ndarray,
+) -> np.ndarray:
+    n = len(individual_codes)
+    event_ids = np.zeros(n, dtype=np.int64)
+    event_counter = 0
+    start = 0
+    for idx in range(1, n + 1):
+        if idx < n and individual_codes[idx] == individual_codes[start] and exposure[idx] == exposure[start]:
+            continue
+        if exposure[start] and individual_codes[start] >= 0 and idx - start >= min_points[start]:
+            event_counter += 1
+            event_ids[start:idx] = event_counter
+        start = idx
+    return event_ids
+
+
+def _label_heat_blocks_vectorized(
+    individual_codes: np.ndarray,
+    exposure: np.ndarray,
+    min_points: np.ndarray,
+) -> np.ndarray:
+    n = len(individual_codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    new_block = np.ones(n, dtype=bool)
+    new_block[1:] = (individual_codes[1:] != individual_codes[:-1]) | (exposure[1:] != exposure[:-1])
+    starts = np.flatnonzero(new_block)
+    lengths = np.diff(np.append(starts, n))
+    qualifies = exposure[starts] & (individual_codes[starts] >= 0) & (lengths >= min_points[starts])
+    block_event_ids = np.where(qualifies, np.cumsum(qualifies), 0)
+    return np.repeat(block_event_ids, lengths)
+
+
+_label_heat_blocks_jit = njit(cache=True)(_label_heat_blocks_loop) if njit is not None else None
+
+
+def label_heat_blocks(
+    individual_codes: np.ndarray,
+    exposure: np.ndarray,
+    min_points: np.ndarray,
+) -> np.ndarray:
+    """Number qualifying heat-exposed runs in rows sorted by individual and time.
+
+    Returns one int64 per row: the 1-based event id, or 0 where the row is not part of an event.
+    Rows with a negative individual code (missing individual) never form events.
+    """
+    if _label_heat_blocks_jit is not None:
+        return _label_heat_blocks_jit(individual_codes, exposure, min_points)
+    return _label_heat_blocks_vectorized(individual_codes, exposure, min_points)
+
+
+def prepare_heat_frame(
     aligned_df: pd.DataFrame,
     thresholds: Dict[str, float],
     default_threshold: float,
     heat_window_hours: int,
-) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    df = aligned_df.copy()
+) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Sort points and derive everything about heat detection that does not depend on exposure.
+
+    Returns the sorted frame with ``heat_threshold_c`` attached, the per-row individual codes and
+    the per-row minimum run length, so several threshold offsets can reuse one preparation.
+    """
+    df = aligned_df.copy(deep=False)
     df["timestamp"] = ensure_datetime(df["timestamp"])
-    df["heat_threshold_c"] = df["species"].map(thresholds).fillna(default_threshold)
-    df["heat_exposure"] = df["temp_c"] >= df["heat_threshold_c"]
+    df["heat_threshold_c"] = df["species"].map(thresholds).astype(float).fillna(default_threshold)
     df = df.sort_values(["individual_id", "timestamp"]).reset_index(drop=True)
 
-    events = []
-    df["heat_event_id"] = pd.NA
-    event_counter = 0
+    window_seconds = heat_window_hours * 3600
+    # Rows are already ordered by individual and time, so groups never need re-sorting.
+    fix_seconds = df.groupby("individual_id", sort=False, observed=True)["timestamp"].diff().dt.total_seconds()
+    median_seconds = fix_seconds.groupby(df["individual_id"], sort=False, observed=True).transform("median")
+    median_seconds = median_seconds.where(median_seconds > 0, window_seconds)
+    min_points = np.maximum(1, np.ceil(window_seconds / median_seconds.to_numpy()))
 
-    for individual_id, group in df.groupby("individual_id"):
-        group = group.sort_values("timestamp")
-        median_dt = group["timestamp"].diff().median()
-        median_seconds = median_dt.total_seconds() if pd.notnull(median_dt) else heat_window_hours * 3600
-        if median_seconds <= 0:
-            median_seconds = heat_window_hours * 3600
-        min_points = max(1, int(math.ceil(heat_window_hours * 3600 / median_seconds)))
-
-        heat_block = (group["heat_exposure"] != group["heat_exposure"].shift()).cumsum()
-        for _, block in group.groupby(heat_block):
-            if not bool(block["heat_exposure"].iloc[0]):
-                continue
-            if len(block) < min_points:
-                continue
-            event_counter += 1
-            df.loc[block.index, "heat_event_id"] = event_counter
-            duration_hours = (block["timestamp"].max() - block["timestamp"].min()).total_seconds() / 3600
-            events.append(
-                {
-                    "heat_event_id": event_counter,
-                    "individual_id": individual_id,
-                    "species": block["species"].iloc[0],
-                    "start_time": block["timestamp"].min(),
-                    "end_time": block["timestamp"].max(),
-                    "duration_hours": duration_hours,
-                    "num_points": len(block),
-                    "mean_temp_c": block["temp_c"].mean(),
-                    "max_temp_c": block["temp_c"].max(),
-                }
-            )
-
-    events_df = pd.DataFrame(events)
+    individual_codes, _ = pd.factorize(df["individual_id"])
+    return df, individual_codes, min_points
+
+
+def assign_heat_events(
+    prepared_df: pd.DataFrame,
+    individual_codes: np.ndarray,
+    min_points: np.ndarray,
+    threshold_offset: float = 0.0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    df = prepared_df.copy(deep=False)
+    if threshold_offset:
+        df["heat_threshold_c"] = df["heat_threshold_c"] + threshold_offset
+    df["heat_exposure"] = df["temp_c"] >= df["heat_threshold_c"]
+
+    event_ids = label_heat_blocks(individual_codes, df["heat_exposure"].to_numpy(dtype=bool), min_points)
+    in_event = event_ids > 0
+    heat_event_id = pd.array(event_ids, dtype="Int64")
+    heat_event_id[~in_event] = pd.NA
+    df["heat_event_id"] = heat_event_id
+
+    events_df = df[in_event].groupby("heat_event_id", sort=False).agg(
+        individual_id=("individual_id", "first"),
+        species=("species", "first"),
+        start_time=("timestamp", "min"),
+        end_time=("timestamp", "max"),
+        num_points=("temp_c", "size"),
+        mean_temp_c=("temp_c", "mean"),
+        max_temp_c=("temp_c", "max"),
+    ).reset_index()
+    events_df["heat_event_id"] = events_df["heat_event_id"].astype(np.int64)
+    events_df.insert(
+        5,
+        "duration_hours",
+        (events_df["end_time"] - events_df["start_time"]).dt.total_seconds() / 3600,
+    )
     return df, events_df
+
+
+def detect_heat_events(
+    aligned_df: pd.DataFrame,
+    thresholds: Dict[str, float],
+    default_threshold: float,
+    heat_window_hours: int,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    prepared_df, individual_codes, min_points = prepare_heat_frame(
+        aligned_df,
+        thresholds,
+        default_threshold,
+        heat_window_hours,
+    )
+    return assign_heat_events(prepared_df, individual_codes, min_points)
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import hashlib
 import json
+import mmap
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, Optional
 
@@ -13,22 +16,48 @@ import importlib.metadata
 from .config import PipelineConfig
 
 
-def _sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+def _sha256(path: Path) -> str:
     digest = hashlib.sha256()
     with path.open("rb") as handle:
-        while True:
-            chunk = handle.read(chunk_size)
-            if not chunk:
-                break
-            digest.update(chunk)
+        if path.stat().st_size == 0:
+            return digest.hexdigest()
+        # A single update over the mapping lets hashlib release the GIL for the whole file.
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            digest.update(mapped)
     return digest.hexdigest()
 
 
+def _sha256_many(paths: Iterable[Path], max_workers: int = 4) -> Dict[Path, str]:
+    unique_paths = list(dict.fromkeys(paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        digests = executor.map(_sha256, unique_paths)
+        return dict(zip(unique_paths, digests))
+
+
+def _read_git_head(git_dir: Path) -> Optional[str]:
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref:"):
+        return head
+    ref = head.split(":", 1)[1].strip()
+    ref_path = git_dir / ref
+    if ref_path.exists():
+        return ref_path.read_text().strip()
+    packed_refs = git_dir / "packed-refs"
+    if packed_refs.exists():
+        for line in packed_refs.read_text().splitlines():
+            if line.endswith(f" {ref}"):
+                return line.split(" ", 1)[0]
+    return None
+
+
 def _git_info(repo_dir: Path) -> Dict[str, str]:
     try:
-        commit = subprocess.check_output(
-            ["git", "rev-parse", "HEAD"], cwd=repo_dir, stderr=subprocess.DEVNULL
-        ).decode().strip()
+        git_dir = repo_dir / ".git"
+        commit = _read_git_head(git_dir) if git_dir.is_dir() else None
+        if commit is None:
+            commit = subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], cwd=repo_dir, stderr=subprocess.DEVNULL
+            ).decode().strip()
         status = subprocess.check_output(
             ["git", "status", "--porcelain"], cwd=repo_dir, stderr=subprocess.DEVNULL
         ).decode().strip()
@@ -40,14 +69,16 @@ def _git_info(repo_dir: Path) -> Dict[str, str]:
         return {"commit": "unknown", "dirty": "unknown"}
 
 
+@lru_cache(maxsize=None)
+def _package_version(package: str) -> str:
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return "not-installed"
+
+
 def _package_versions(packages: Iterable[str]) -> Dict[str, str]:
-    versions: Dict[str, str] = {}
-    for pkg in packages:
-        try:
-            versions[pkg] = importlib.metadata.version(pkg)
-        except importlib.metadata.PackageNotFoundError:
-            versions[pkg] = "not-installed"
-    return versions
+    return {pkg: _package_version(pkg) for pkg in packages}
 
 
 def build_run_metadata(
@@ -77,27 +108,30 @@ def build_run_metadata(
         if isinstance(value, Path):
             config_dict[key] = str(value)
 
+    future_items = list(future_climate_paths.items()) if future_climate_paths else []
+    checksums = _sha256_many([gps_path, climate_path, *(path for _, path in future_items)])
+
     metadata: Dict[str, object] = {
         "run_timestamp": datetime.now(UTC).isoformat(),
         "config": config_dict,
         "inputs": {
             "gps_path": str(gps_path),
-            "gps_sha256": _sha256(gps_path),
+            "gps_sha256": checksums[gps_path],
             "gps_size_bytes": gps_path.stat().st_size,
             "climate_path": str(climate_path),
-            "climate_sha256": _sha256(climate_path),
+            "climate_sha256": checksums[climate_path],
             "climate_size_bytes": climate_path.stat().st_size,
         },
         "package_versions": package_versions,
         "git": _git_info(Path(__file__).resolve().parents[1]),
     }
 
-    if future_climate_paths:
+    if future_items:
         future_meta = {}
-        for scenario, path in future_climate_paths.items():
+        for scenario, path in future_items:
             future_meta[scenario] = {
                 "path": str(path),
-                "sha256": _sha256(path),
+                "sha256": checksums[path],
                 "size_bytes": path.stat().st_size,
             }
         metadata["inputs"]["future_climate"] = future_meta
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import pickle
+import importlib
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+import joblib
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
@@ -12,6 +14,16 @@ from sklearn.neighbors import BallTree
 
 from .utils import EARTH_RADIUS_KM, ensure_datetime
 
+MODEL_BACKENDS = ("sklearn", "lightgbm")
+
+
+def _optional_module(name: str, purpose: str):
+    # Optional backends are imported on first use; lightgbm alone costs ~0.25 s of startup for every CLI run.
+    try:
+        return importlib.import_module(name)
+    except ImportError:  # pragma: no cover
+        raise RuntimeError(f"{name} is required {purpose} (pip install -r requirements-optional.txt)") from None
+
 
 @dataclass
 class FeatureSpec:
@@ -28,7 +40,7 @@ def build_features(
     data["timestamp"] = ensure_datetime(data["timestamp"])
     data["hour"] = data["timestamp"].dt.hour
     data["dayofyear"] = data["timestamp"].dt.dayofyear
-    data["heat_threshold_c"] = data["species"].map(thresholds).fillna(np.nan)
+    data["heat_threshold_c"] = data["species"].map(thresholds).astype(float)
 
     base_features = [
         "lat",
@@ -52,6 +64,11 @@ def build_features(
     feature_df = pd.concat([data[base_features], species_dummies], axis=1)
     feature_df = feature_df.fillna(feature_df.median(numeric_only=True))
     feature_df = feature_df.fillna(0)
+    # Forests split on float32 internally; narrow the matrix once here instead of inside every fit.
+    feature_df = feature_df.astype({
+        column: np.float32 if column in base_features else np.int8
+        for column in feature_df.columns
+    })
 
     spec = FeatureSpec(columns=list(feature_df.columns), species_levels=species_levels)
     return feature_df, spec
@@ -66,9 +83,9 @@ def label_refugia_points(
         raise ValueError("Refugia clusters are required to label points")
 
     labeled = df.copy()
-    coords = np.radians(refugia_df[["centroid_lat", "centroid_lon"]].to_numpy())
+    coords = np.radians(refugia_df[["centroid_lat", "centroid_lon"]].to_numpy(dtype=np.float64))
     tree = BallTree(coords, metric="haversine")
-    gps_coords = np.radians(labeled[["lat", "lon"]].to_numpy())
+    gps_coords = np.radians(labeled[["lat", "lon"]].to_numpy(dtype=np.float64))
     dist, _ = tree.query(gps_coords, k=1)
     dist_km = dist.flatten() * EARTH_RADIUS_KM
     labeled["refugia_distance_km"] = dist_km
@@ -76,6 +93,52 @@ def label_refugia_points(
     return labeled
 
 
+def build_classifier(
+    random_state: int,
+    n_estimators: int,
+    max_depth: int,
+    backend: str = "sklearn",
+    n_jobs: int = -1,
+):
+    if backend == "lightgbm":
+        lightgbm = _optional_module("lightgbm", "when the lightgbm model backend is selected")
+        # Random-forest mode: bagged rows and columns, histogram split finding, trees built multithreaded.
+        return lightgbm.LGBMClassifier(
+            boosting_type="rf",
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            num_leaves=min(2 ** max_depth, 2 ** 12),
+            subsample=0.8,
+            subsample_freq=1,
+            colsample_bytree=0.8,
+            # Match the forest's one-row leaves; the default of 20 stops small study areas from splitting.
+            min_child_samples=1,
+            class_weight="balanced",
+            random_state=random_state,
+            n_jobs=n_jobs,
+            verbose=-1,
+        )
+    if backend != "sklearn":
+        raise ValueError(f"Unknown model backend: {backend}")
+    return RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        random_state=random_state,
+        class_weight="balanced",
+        n_jobs=n_jobs,
+    )
+
+
+def _memmap_features(X: pd.DataFrame, path: Path) -> pd.DataFrame:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=X.shape)
+    for position, column in enumerate(X.columns):
+        matrix[:, position] = X[column].to_numpy()
+    matrix.flush()
+    # A single float32 block wrapping the memmap: estimators take it without a private in-memory copy.
+    return pd.DataFrame(matrix, index=X.index, columns=X.columns, copy=False)
+
+
 def train_model(
     heat_df: pd.DataFrame,
     refugia_df: pd.DataFrame,
@@ -84,34 +147,60 @@ def train_model(
     n_estimators: int,
     max_depth: int,
     radius_km: float = 3.0,
-) -> Tuple[RandomForestClassifier, FeatureSpec, pd.DataFrame]:
+    backend: str = "sklearn",
+    feature_cache: Optional[Path] = None,
+    n_jobs: int = -1,
+) -> Tuple[RandomForestClassifier, FeatureSpec, pd.DataFrame, pd.DataFrame, pd.Series]:
     labeled = label_refugia_points(heat_df, refugia_df, radius_km)
     X, spec = build_features(labeled, thresholds)
-    y = labeled["is_refugia_point"].astype(int)
+    if feature_cache is not None:
+        X = _memmap_features(X, feature_cache)
+    y = labeled["is_refugia_point"].astype(np.int8)
 
-    model = RandomForestClassifier(
-        n_estimators=n_estimators,
-        max_depth=max_depth,
-        random_state=random_state,
-        class_weight="balanced",
-        n_jobs=-1,
-    )
+    model = build_classifier(random_state, n_estimators, max_depth, backend, n_jobs)
     model.fit(X, y)
-    return model, spec, labeled
+    return model, spec, labeled, X, y
 
 
-def save_model(model: RandomForestClassifier, spec: FeatureSpec, path: Path) -> None:
+def save_model(
+    model: RandomForestClassifier,
+    spec: FeatureSpec,
+    path: Path,
+    compress: Union[int, Tuple[str, int]] = 0,
+) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("wb") as f:
-        pickle.dump({"model": model, "spec": spec}, f)
+    # joblib writes NumPy buffers raw instead of through pickle; compress takes a level or a (method, level) pair.
+    joblib.dump({"model": model, "spec": spec}, path, compress=compress)
 
 
 def load_model(path: Path) -> Tuple[RandomForestClassifier, FeatureSpec]:
-    with path.open("rb") as f:
-        payload = pickle.load(f)
+    # joblib detects the compression itself and also reads models written with plain pickle.
+    payload = joblib.load(path)
     return payload["model"], payload["spec"]
 
 
+def export_compiled_model(model, X: pd.DataFrame, path: Path, parallel_comp: int = 32) -> Path:
+    treelite = _optional_module("treelite", "to compile models")
+    tl2cgen = _optional_module("tl2cgen", "to compile models")
+    # A LightGBM model can only exist if lightgbm was already imported to build or unpickle it.
+    lightgbm = sys.modules.get("lightgbm")
+    if lightgbm is not None and isinstance(model, lightgbm.LGBMClassifier):
+        tl_model = treelite.frontend.from_lightgbm(model.booster_)
+    else:
+        tl_model = treelite.sklearn.import_model(model)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Branch frequencies from the training rows let the generated C order each split's likely side first.
+    annotation_path = path.with_suffix(".annotation.json")
+    tl2cgen.annotate_branch(tl_model, tl2cgen.DMatrix(X.to_numpy(dtype=np.float32)), annotation_path)
+    tl2cgen.export_lib(
+        tl_model,
+        toolchain="gcc",
+        libpath=path,
+        params={"parallel_comp": parallel_comp, "annotate_in": str(annotation_path)},
+    )
+    return path
+
+
 def predict_future_refugia(
     climate_df: pd.DataFrame,
     model: RandomForestClassifier,
@@ -120,25 +209,31 @@ def predict_future_refugia(
     species_list: Iterable[str],
     probability_threshold: float = 0.7,
 ) -> pd.DataFrame:
-    predictions = []
-
+    temp_c = climate_df["temp_c"].to_numpy()
+    species_rows = []
     for species in species_list:
         threshold = thresholds.get(species)
-        subset = climate_df.copy()
-        subset["species"] = species
-        if threshold is not None:
-            subset = subset[subset["temp_c"] >= threshold]
-        if subset.empty:
-            continue
+        rows = np.flatnonzero(temp_c >= threshold) if threshold is not None else np.arange(len(climate_df))
+        if rows.size:
+            species_rows.append((species, rows))
+
+    if not species_rows:
+        return pd.DataFrame()
+
+    # Output size is known up front, so probabilities fill one buffer instead of concatenating frames.
+    counts = [rows.size for _, rows in species_rows]
+    probability = np.empty(sum(counts), dtype=np.float64)
+    offset = 0
+    for species, rows in species_rows:
+        subset = climate_df.iloc[rows].assign(species=species)
         X, _ = build_features(subset, thresholds, species_levels=spec.species_levels)
         X = X.reindex(columns=spec.columns, fill_value=0)
-        prob = model.predict_proba(X)[:, 1]
-        output = subset[["timestamp", "lat", "lon", "temp_c", "humidity", "precip_mm"]].copy()
-        output["species"] = species
-        output["refugia_probability"] = prob
-        output["is_refugia_pred"] = prob >= probability_threshold
-        predictions.append(output)
-
-    if not predictions:
-        return pd.DataFrame()
-    return pd.concat(predictions, ignore_index=True)
+        probability[offset:offset + rows.size] = model.predict_proba(X)[:, 1]
+        offset += rows.size
+
+    all_rows = np.concatenate([rows for _, rows in species_rows])
+    output = climate_df[["timestamp", "lat", "lon", "temp_c", "humidity", "precip_mm"]].iloc[all_rows].reset_index(drop=True)
+    output["species"] = np.repeat(np.array([species for species, _ in species_rows], dtype=object), counts)
+    output["refugia_probability"] = probability
+    output["is_refugia_pred"] = probability >= probability_threshold
+    return output
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
 
 from .case_studies import build_case_studies
 from .clustering import cluster_refugia
@@ -20,23 +22,65 @@ from .experiments import (
 )
 from .heat_events import detect_heat_events
 from .metadata import build_run_metadata, write_run_metadata
-from .modeling import FeatureSpec, build_features, predict_future_refugia, save_model, train_model
+from .modeling import (
+    FeatureSpec,
+    build_classifier,
+    build_features,
+    predict_future_refugia,
+    save_model,
+    train_model,
+)
 from .preprocessing import align_gps_climate, clean_climate, clean_gps
-from .quality_checks import assert_quality, climate_quality_summary, gps_quality_summary
+from .quality_checks import assert_quality
 from .reporting import build_report
 from .validation import bootstrap_uncertainty, cross_validate_model, refugia_vs_random_tests, spatial_consistency
+from .utils import read_csv, write_parquet, write_spatial_dataset
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover
+    pl = None
 
 
-def _load_dataframe(path: Path) -> pd.DataFrame:
+def _load_dataframe(path: Path, start: Optional[datetime] = None, end: Optional[datetime] = None) -> pd.DataFrame:
     if path.suffix.lower() in {".parquet"}:
         return pd.read_parquet(path)
     if path.suffix.lower() in {".csv"}:
-        return pd.read_csv(path)
+        return read_csv(path)
     if path.suffix.lower() in {".nc", ".netcdf"}:
-        return era5_to_dataframe(path)
+        return era5_to_dataframe(path, start=start, end=end)
     raise ValueError(f"Unsupported file type: {path}")
 
 
+def _auto_thresholds(aligned_df: pd.DataFrame, quantile: float, use_polars: bool) -> Dict[str, float]:
+    if use_polars:
+        if pl is None:
+            raise RuntimeError("polars is required when use_polars is enabled")
+        quantiles = (
+            pl.from_pandas(aligned_df[["species", "temp_c"]])
+            .group_by("species", maintain_order=True)
+            .agg(pl.col("temp_c").cast(pl.Float64).quantile(quantile, interpolation="linear"))
+            .drop_nulls("species")
+            .sort("species")
+        )
+        return dict(zip(quantiles["species"].to_list(), quantiles["temp_c"].to_list()))
+
+    codes, species = pd.factorize(aligned_df["species"], sort=True)
+    if len(codes) == 0:
+        return {}
+    # One stable sort lays each species out as a contiguous run; quantiles are then taken per slice.
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    sorted_temps = aligned_df["temp_c"].to_numpy(dtype=np.float64)[order]
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=sorted_codes[0] - 1))
+    ends = np.append(starts[1:], len(sorted_codes))
+    return {
+        species[code]: float(np.nanquantile(sorted_temps[start:end], quantile))
+        for code, start, end in zip(sorted_codes[starts], starts, ends)
+        if code >= 0
+    }
+
+
 def run_pipeline(
     config: PipelineConfig,
     gps_path: Path,
@@ -47,25 +91,32 @@ def run_pipeline(
     config.outputs_dir.mkdir(parents=True, exist_ok=True)
 
     gps_df = load_movebank_csv(gps_path) if gps_path.suffix.lower() == ".csv" else _load_dataframe(gps_path)
-    climate_df = _load_dataframe(climate_path)
-
     gps_df = clean_gps(gps_df)
-    climate_df = clean_climate(climate_df)
 
-    assert_quality(gps_df, climate_df)
+    # Only climate within the alignment tolerance of a GPS fix can match, so NetCDF reads skip the rest.
+    margin = timedelta(minutes=config.time_tolerance_minutes)
+    climate_start = climate_end = None
+    if not gps_df.empty:
+        climate_start = gps_df["timestamp"].min() - margin
+        climate_end = gps_df["timestamp"].max() + margin
+    climate_df = clean_climate(_load_dataframe(climate_path, start=climate_start, end=climate_end))
 
-    aligned_df = align_gps_climate(gps_df, climate_df, time_tolerance_minutes=config.time_tolerance_minutes)
-    aligned_path = config.outputs_dir / "aligned_data.parquet"
-    aligned_df.to_parquet(aligned_path, index=False)
+    gps_quality, climate_quality = assert_quality(gps_df, climate_df)
+
+    aligned_df = align_gps_climate(
+        gps_df,
+        climate_df,
+        time_tolerance_minutes=config.time_tolerance_minutes,
+        use_polars=config.use_polars,
+    )
+    # A directory of tiled parquet files, named apart from the single-file layout older runs wrote.
+    aligned_path = config.outputs_dir / "aligned_data"
+    write_spatial_dataset(aligned_df, aligned_path, config.aligned_tile_deg)
 
     thresholds = config.load_species_thresholds()
     thresholds_path = config.outputs_dir / "species_thresholds_used.csv"
     if not thresholds:
-        thresholds = (
-            aligned_df.groupby("species")["temp_c"]
-            .quantile(config.auto_threshold_quantile)
-            .to_dict()
-        )
+        thresholds = _auto_thresholds(aligned_df, config.auto_threshold_quantile, config.use_polars)
     if thresholds:
         pd.DataFrame(
             [{"species": species, "heat_threshold_c": value} for species, value in thresholds.items()]
@@ -77,9 +128,9 @@ def run_pipeline(
         heat_window_hours=config.heat_window_hours,
     )
     heat_path = config.outputs_dir / "heat_events.parquet"
-    heat_df.to_parquet(heat_path, index=False)
+    write_parquet(heat_df, heat_path)
     events_path = config.outputs_dir / "heat_event_summary.parquet"
-    events_df.to_parquet(events_path, index=False)
+    write_parquet(events_df, events_path)
 
     clustered_df, clusters_df = cluster_refugia(
         heat_df,
@@ -87,39 +138,45 @@ def run_pipeline(
         min_samples=config.clustering_min_samples,
     )
     clustered_path = config.outputs_dir / "heat_events_with_clusters.parquet"
-    clustered_df.to_parquet(clustered_path, index=False)
+    write_parquet(clustered_df, clustered_path)
     clusters_path = config.outputs_dir / "refugia_clusters.parquet"
-    clusters_df.to_parquet(clusters_path, index=False)
+    write_parquet(clusters_df, clusters_path)
 
-    heat_points = clustered_df[clustered_df["heat_event_id"].notna()].copy()
+    # train_model labels a copy of the points, so a filtered view is enough here.
+    heat_points = clustered_df.loc[clustered_df["heat_event_id"].notna().to_numpy()]
     if heat_points.empty:
         raise ValueError("No heat events available for model training")
-    if clusters_df.empty or clusters_df["is_refugia"].sum() == 0:
+    refugia_clusters = clusters_df
+    if not clusters_df.empty:
+        refugia_clusters = clusters_df.loc[clusters_df["is_refugia"].to_numpy(dtype=bool)]
+    if refugia_clusters.empty:
         raise ValueError("No refugia clusters available for model training")
-    model, spec, labeled_df = train_model(
+    model, spec, labeled_df, X_train, y_train = train_model(
         heat_points,
-        clusters_df[clusters_df["is_refugia"]],
+        refugia_clusters,
         thresholds,
         random_state=config.model_random_state,
         n_estimators=config.model_n_estimators,
         max_depth=config.model_max_depth,
+        backend=config.model_backend,
+        n_jobs=config.model_n_jobs,
     )
     labeled_path = config.outputs_dir / "labeled_heat_points.parquet"
-    labeled_df.to_parquet(labeled_path, index=False)
+    write_parquet(labeled_df, labeled_path)
 
     model_path = config.outputs_dir / "model.pkl"
     save_model(model, spec, model_path)
 
-    def model_builder() -> RandomForestClassifier:
-        return RandomForestClassifier(
-            n_estimators=config.model_n_estimators,
-            max_depth=config.model_max_depth,
-            random_state=config.model_random_state,
-            class_weight="balanced",
-            n_jobs=-1,
+    def model_builder():
+        return build_classifier(
+            config.model_random_state,
+            config.model_n_estimators,
+            config.model_max_depth,
+            config.model_backend,
+            config.model_n_jobs,
         )
 
-    validation_metrics = cross_validate_model(labeled_df, thresholds, model_builder)
+    validation_metrics = cross_validate_model(labeled_df, thresholds, model_builder, n_jobs=config.model_n_jobs)
     stats_tests = refugia_vs_random_tests(labeled_df)
     spatial_metrics = spatial_consistency(clusters_df, clustered_df)
 
@@ -128,17 +185,17 @@ def run_pipeline(
         "cross_validation": validation_metrics,
         "stats_tests": stats_tests,
         "spatial_metrics": spatial_metrics,
-        "gps_quality": gps_quality_summary(gps_df),
-        "climate_quality": climate_quality_summary(climate_df),
+        "gps_quality": gps_quality,
+        "climate_quality": climate_quality,
     }, indent=2, default=str))
 
     future_outputs = {}
     scenario_predictions: Dict[str, pd.DataFrame] = {}
     if future_climate_paths:
         species_list = sorted(aligned_df["species"].unique())
-        for scenario, path in future_climate_paths.items():
-            future_df = _load_dataframe(path)
-            future_df = clean_climate(future_df)
+
+        def process_scenario(scenario: str, path: Path) -> Tuple[pd.DataFrame, Path]:
+            future_df = clean_climate(_load_dataframe(path))
             future_pred = predict_future_refugia(
                 future_df,
                 model,
@@ -148,21 +205,41 @@ def run_pipeline(
                 probability_threshold=probability_threshold,
             )
             future_path = config.outputs_dir / f"future_refugia_{scenario}.parquet"
-            future_pred.to_parquet(future_path, index=False)
-            future_outputs[f"future_refugia_{scenario}"] = future_path
-            scenario_predictions[scenario] = future_pred
+            write_parquet(future_pred, future_path)
+            return future_pred, future_path
 
-    uncertainty_df = bootstrap_uncertainty(labeled_df, climate_df, thresholds, model_builder, spec)
+        # Loading, prediction and parquet writes mostly release the GIL, so scenarios overlap on threads.
+        # Each worker holds a full scenario grid in memory, so at most two are loaded at once.
+        with ThreadPoolExecutor(max_workers=min(2, len(future_climate_paths))) as executor:
+            futures = {
+                scenario: executor.submit(process_scenario, scenario, path)
+                for scenario, path in future_climate_paths.items()
+            }
+            for scenario, future in futures.items():
+                future_pred, future_path = future.result()
+                future_outputs[f"future_refugia_{scenario}"] = future_path
+                scenario_predictions[scenario] = future_pred
+
+    uncertainty_df = bootstrap_uncertainty(
+        labeled_df,
+        climate_df,
+        thresholds,
+        model_builder,
+        spec,
+        X=X_train,
+        y=y_train,
+        n_jobs=config.model_n_jobs,
+    )
     uncertainty_path = config.outputs_dir / "uncertainty.parquet"
     if not uncertainty_df.empty:
-        uncertainty_df.to_parquet(uncertainty_path, index=False)
+        write_parquet(uncertainty_df, uncertainty_path)
 
     experiment_outputs = {}
     years = sorted(aligned_df["timestamp"].dt.year.unique())
     if years:
         heatwave_df = heatwave_response_analysis(heat_df, years=years, eps_km=config.clustering_eps_km, min_samples=config.clustering_min_samples)
         heatwave_path = config.outputs_dir / "experiment_heatwave_response.parquet"
-        heatwave_df.to_parquet(heatwave_path, index=False)
+        write_parquet(heatwave_df, heatwave_path)
         experiment_outputs["heatwave_response"] = heatwave_path
 
     if len(scenario_predictions) >= 2:
@@ -176,7 +253,7 @@ def run_pipeline(
                 probability_threshold=probability_threshold,
             )
             shift_path = config.outputs_dir / f"experiment_climate_shift_{scenario_a}_vs_{scenario_b}.parquet"
-            shift_df.to_parquet(shift_path, index=False)
+            write_parquet(shift_df, shift_path)
             experiment_outputs[f"climate_shift_{scenario_a}_vs_{scenario_b}"] = shift_path
 
     model_comp = model_comparison_empirical_vs_climate(clustered_df)
@@ -194,7 +271,7 @@ def run_pipeline(
         heat_window_hours=config.heat_window_hours,
     )
     sensitivity_path = config.outputs_dir / "experiment_sensitivity.parquet"
-    sensitivity_df.to_parquet(sensitivity_path, index=False)
+    write_parquet(sensitivity_df, sensitivity_path)
     experiment_outputs["sensitivity"] = sensitivity_path
 
     case_study_path = config.outputs_dir / "case_studies.md"
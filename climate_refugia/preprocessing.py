@@ -1,12 +1,65 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Tuple
 
 import numpy as np
 import pandas as pd
-from sklearn.neighbors import BallTree
 
-from .utils import EARTH_RADIUS_KM, ensure_datetime, haversine_km
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover
+    pl = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover
+    njit = None
+    prange = range
+
+from .utils import EARTH_RADIUS_KM, ensure_categorical, ensure_datetime, haversine_km_vec
+
+
+def _narrow_floats(df: pd.DataFrame, columns: Tuple[str, ...]) -> pd.DataFrame:
+    # Kilometre-scale refugia analysis does not need float64 storage; distances upcast where computed.
+    return df.astype({column: np.float32 for column in columns if column in df.columns})
+
+
+def _coordinate_mask_loop(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    mask = np.empty(lat.shape[0], dtype=np.bool_)
+    for i in prange(lat.shape[0]):
+        # NaN compares false, so missing coordinates are dropped along with out-of-range ones.
+        mask[i] = -90.0 <= lat[i] <= 90.0 and -180.0 <= lon[i] <= 180.0
+    return mask
+
+
+def _fix_mask_loop(dt_s: np.ndarray, speed: np.ndarray, min_interval_s: float, max_speed: float) -> np.ndarray:
+    mask = np.empty(dt_s.shape[0], dtype=np.bool_)
+    for i in prange(dt_s.shape[0]):
+        mask[i] = (np.isnan(dt_s[i]) or dt_s[i] >= min_interval_s) and (np.isnan(speed[i]) or speed[i] <= max_speed)
+    return mask
+
+
+# Each mask is one fused pass over the columns instead of a temporary array per comparison.
+_coordinate_mask_jit = njit(cache=True, parallel=True)(_coordinate_mask_loop) if njit is not None else None
+_fix_mask_jit = njit(cache=True, parallel=True)(_fix_mask_loop) if njit is not None else None
+
+
+def _float_values(series: pd.Series) -> np.ndarray:
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _coordinate_mask(df: pd.DataFrame) -> np.ndarray:
+    lat = _float_values(df["lat"])
+    lon = _float_values(df["lon"])
+    if _coordinate_mask_jit is not None:
+        return _coordinate_mask_jit(lat, lon)
+    return (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)
+
+
+def _fix_mask(dt_s: np.ndarray, speed: np.ndarray, min_interval_s: float, max_speed: float) -> np.ndarray:
+    if _fix_mask_jit is not None:
+        return _fix_mask_jit(dt_s, speed, float(min_interval_s), float(max_speed))
+    return (np.isnan(dt_s) | (dt_s >= min_interval_s)) & (np.isnan(speed) | (speed <= max_speed))
 
 
 def clean_gps(
@@ -14,13 +67,16 @@ def clean_gps(
     max_speed_mps: float = 35.0,
     min_fix_interval_s: int = 30,
 ) -> pd.DataFrame:
-    df = gps_df.copy()
-    df = df.dropna(subset=["timestamp", "lat", "lon"]).copy()
+    # A shallow copy detaches the filtered frame from gps_df, so the column assignments below do not warn.
+    df = gps_df.dropna(subset=["timestamp", "lat", "lon"]).copy(deep=False)
     df["lat"] = pd.to_numeric(df["lat"], errors="coerce")
     df["lon"] = pd.to_numeric(df["lon"], errors="coerce")
     df["timestamp"] = ensure_datetime(df["timestamp"])
     df = df.dropna(subset=["timestamp"])
-    df = df[(df["lat"].between(-90, 90)) & (df["lon"].between(-180, 180))]
+    df = df[_coordinate_mask(df)]
+    for column in ("species", "individual_id"):
+        if column in df.columns:
+            df[column] = ensure_categorical(df[column])
     df = df.sort_values(["individual_id", "timestamp"]).reset_index(drop=True)
 
     if "speed_mps" not in df.columns:
@@ -28,36 +84,25 @@ def clean_gps(
     else:
         df["speed_mps"] = pd.to_numeric(df["speed_mps"], errors="coerce")
 
-    def compute_speed(group: pd.DataFrame) -> pd.DataFrame:
-        group = group.sort_values("timestamp")
-        distances_km = [np.nan]
-        time_s = [np.nan]
-        for idx in range(1, len(group)):
-            prev = group.iloc[idx - 1]
-            curr = group.iloc[idx]
-            dist = haversine_km(prev["lat"], prev["lon"], curr["lat"], curr["lon"])
-            dt = (curr["timestamp"] - prev["timestamp"]).total_seconds()
-            distances_km.append(dist)
-            time_s.append(dt)
-        group = group.copy()
-        group["_dist_km"] = distances_km
-        group["_dt_s"] = time_s
-        group.loc[group["_dt_s"] <= 0, "_dt_s"] = np.nan
-        group["speed_mps"] = group["speed_mps"].fillna(group["_dist_km"] * 1000 / group["_dt_s"])
-        group = group[(group["_dt_s"].isna()) | (group["_dt_s"] >= min_fix_interval_s)]
-        return group.drop(columns=["_dist_km", "_dt_s"])
-
-    grouped = []
-    for _, group in df.groupby("individual_id", sort=False):
-        grouped.append(compute_speed(group))
-    df = pd.concat(grouped, ignore_index=True) if grouped else df
-    df = df[(df["speed_mps"].isna()) | (df["speed_mps"] <= max_speed_mps)]
-    return df.reset_index(drop=True)
+    # Rows without an individual cannot be paired with a previous fix and are dropped, as groupby would.
+    df = df[df["individual_id"].notna()]
+    by_individual = df.groupby("individual_id", sort=False, observed=True)
+    dist_km = haversine_km_vec(
+        by_individual["lat"].shift().to_numpy(dtype=float),
+        by_individual["lon"].shift().to_numpy(dtype=float),
+        df["lat"].to_numpy(dtype=float),
+        df["lon"].to_numpy(dtype=float),
+    )
+    dt_s = (df["timestamp"] - by_individual["timestamp"].shift()).dt.total_seconds().to_numpy()
+    dt_s = np.where(dt_s > 0, dt_s, np.nan)
+
+    df = df.assign(speed_mps=df["speed_mps"].fillna(pd.Series(dist_km * 1000 / dt_s, index=df.index)))
+    df = df[_fix_mask(dt_s, _float_values(df["speed_mps"]), min_fix_interval_s, max_speed_mps)]
+    return _narrow_floats(df, ("lat", "lon", "speed_mps")).reset_index(drop=True)
 
 
 def clean_climate(climate_df: pd.DataFrame) -> pd.DataFrame:
-    df = climate_df.copy()
-    df = df.dropna(subset=["timestamp", "lat", "lon", "temp_c"])
+    df = climate_df.dropna(subset=["timestamp", "lat", "lon", "temp_c"]).copy(deep=False)
     df["timestamp"] = ensure_datetime(df["timestamp"])
     df["temp_c"] = pd.to_numeric(df["temp_c"], errors="coerce")
     if "humidity" in df.columns:
@@ -65,17 +110,51 @@ def clean_climate(climate_df: pd.DataFrame) -> pd.DataFrame:
     if "precip_mm" in df.columns:
         df["precip_mm"] = pd.to_numeric(df["precip_mm"], errors="coerce")
     df = df.dropna(subset=["timestamp"])
-    df = df[(df["lat"].between(-90, 90)) & (df["lon"].between(-180, 180))]
-    return df.reset_index(drop=True)
+    df = df[_coordinate_mask(df)]
+    return _narrow_floats(df, ("temp_c", "humidity", "precip_mm", "lat", "lon")).reset_index(drop=True)
+
+
+def _decategorize(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype({
+        column: dtype.categories.dtype
+        for column, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+    })
+
+
+def _join_asof_polars(gps: pd.DataFrame, climate: pd.DataFrame, tolerance: pd.Timedelta) -> pd.DataFrame:
+    # Polars only accepts string dictionaries, so categoricals cross the boundary as plain values.
+    categorical = {
+        column: dtype
+        for frame in (gps, climate)
+        for column, dtype in frame.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+    }
+    gps_pl = pl.from_pandas(_decategorize(gps)).sort("timestamp")
+    climate_pl = pl.from_pandas(_decategorize(climate)).sort("timestamp")
+    aligned = gps_pl.join_asof(
+        climate_pl,
+        on="timestamp",
+        by="grid_key",
+        strategy="nearest",
+        tolerance=tolerance.to_pytimedelta(),
+        suffix="_climate",
+    ).to_pandas()
+    return aligned.astype({column: dtype for column, dtype in categorical.items() if column in aligned.columns})
 
 
 def align_gps_climate(
     gps_df: pd.DataFrame,
     climate_df: pd.DataFrame,
     time_tolerance_minutes: int = 60,
+    use_polars: bool = False,
 ) -> pd.DataFrame:
-    gps = gps_df.copy()
-    climate = climate_df.copy()
+    if use_polars and pl is None:
+        raise RuntimeError("polars is required when use_polars is enabled")
+
+    # Columns are only ever replaced, never written in place, so shallow copies keep the inputs intact.
+    gps = gps_df.copy(deep=False)
+    climate = climate_df.copy(deep=False)
 
     gps["timestamp"] = ensure_datetime(gps["timestamp"])
     climate["timestamp"] = ensure_datetime(climate["timestamp"])
@@ -83,46 +162,42 @@ def align_gps_climate(
     climate = climate.dropna(subset=["timestamp", "lat", "lon"])
     gps = gps.dropna(subset=["timestamp", "lat", "lon"])
 
+    # Imported here so the cleaning-only entry points (validate_data.py) do not load scikit-learn.
+    from sklearn.neighbors import BallTree
+
     climate_grid = climate[["lat", "lon"]].drop_duplicates().reset_index(drop=True)
     tree = BallTree(
-        np.radians(climate_grid[["lat", "lon"]].to_numpy()),
+        np.radians(climate_grid[["lat", "lon"]].to_numpy(dtype=np.float64)),
         metric="haversine",
     )
 
-    gps_coords = np.radians(gps[["lat", "lon"]].to_numpy())
+    gps_coords = np.radians(gps[["lat", "lon"]].to_numpy(dtype=np.float64))
     dist, idx = tree.query(gps_coords, k=1)
     nearest = climate_grid.iloc[idx.flatten()].reset_index(drop=True)
     gps = gps.reset_index(drop=True)
     gps["grid_lat"] = nearest["lat"].to_numpy()
     gps["grid_lon"] = nearest["lon"].to_numpy()
     gps["grid_distance_km"] = dist.flatten() * EARTH_RADIUS_KM
-    gps["grid_key"] = list(zip(gps["grid_lat"], gps["grid_lon"]))
-
-    climate["grid_key"] = list(zip(climate["lat"], climate["lon"]))
-    gps["grid_key"] = gps["grid_key"].astype(str)
-    climate["grid_key"] = climate["grid_key"].astype(str)
-
-    aligned_parts = []
-    for grid_key, gps_group in gps.groupby("grid_key"):
-        climate_group = climate[climate["grid_key"] == grid_key]
-        if climate_group.empty:
-            continue
-        gps_group = gps_group.sort_values("timestamp")
-        climate_group = climate_group.sort_values("timestamp")
-        merged = pd.merge_asof(
-            gps_group,
-            climate_group,
+    gps["grid_key"] = idx.flatten().astype(np.int64)
+    # Groups are numbered in first-appearance order, matching the row positions of climate_grid.
+    climate["grid_key"] = climate.groupby(["lat", "lon"], sort=False).ngroup().astype(np.int64)
+
+    tolerance = pd.Timedelta(minutes=time_tolerance_minutes)
+    if use_polars:
+        aligned = _join_asof_polars(gps, climate, tolerance)
+    else:
+        aligned = pd.merge_asof(
+            gps.sort_values("timestamp", kind="stable"),
+            climate.sort_values("timestamp", kind="stable"),
             on="timestamp",
+            by="grid_key",
             direction="nearest",
-            tolerance=pd.Timedelta(minutes=time_tolerance_minutes),
+            tolerance=tolerance,
             suffixes=("", "_climate"),
         )
-        aligned_parts.append(merged)
-
-    if not aligned_parts:
+    if aligned.empty:
         return pd.DataFrame()
 
-    aligned = pd.concat(aligned_parts, ignore_index=True)
     aligned = aligned.drop(columns=["grid_key"], errors="ignore")
     aligned = aligned.dropna(subset=["temp_c"]).reset_index(drop=True)
     return aligned
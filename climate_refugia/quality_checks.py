@@ -1,32 +1,45 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Tuple
 
-import numpy as np
 import pandas as pd
 
 
+def _missing_rate(df: pd.DataFrame, column: str) -> float:
+    return float(df[column].isna().mean()) if column in df.columns else float("nan")
+
+
+def _nunique(df: pd.DataFrame, column: str) -> float:
+    return float(df[column].nunique()) if column in df.columns else float("nan")
+
+
+def _bound(value) -> float:
+    # Arrow-backed columns with no valid values reduce to pd.NA, which float() rejects.
+    return float("nan") if pd.isna(value) else float(value)
+
+
 def gps_quality_summary(gps_df: pd.DataFrame) -> Dict[str, float]:
-    df = gps_df.copy()
     summary = {
-        "points": float(len(df)),
-        "individuals": float(df["individual_id"].nunique()) if "individual_id" in df.columns else float("nan"),
-        "species": float(df["species"].nunique()) if "species" in df.columns else float("nan"),
-        "missing_lat": float(df["lat"].isna().mean()) if "lat" in df.columns else float("nan"),
-        "missing_lon": float(df["lon"].isna().mean()) if "lon" in df.columns else float("nan"),
+        "points": float(len(gps_df)),
+        "individuals": _nunique(gps_df, "individual_id"),
+        "species": _nunique(gps_df, "species"),
+        "missing_lat": _missing_rate(gps_df, "lat"),
+        "missing_lon": _missing_rate(gps_df, "lon"),
     }
     return summary
 
 
 def climate_quality_summary(climate_df: pd.DataFrame) -> Dict[str, float]:
-    df = climate_df.copy()
+    temp_min = temp_max = float("nan")
+    if "temp_c" in climate_df.columns:
+        temp_min, temp_max = _bound(climate_df["temp_c"].min()), _bound(climate_df["temp_c"].max())
     summary = {
-        "rows": float(len(df)),
-        "missing_temp": float(df["temp_c"].isna().mean()) if "temp_c" in df.columns else float("nan"),
-        "missing_humidity": float(df["humidity"].isna().mean()) if "humidity" in df.columns else float("nan"),
-        "missing_precip": float(df["precip_mm"].isna().mean()) if "precip_mm" in df.columns else float("nan"),
-        "temp_min": float(df["temp_c"].min()) if "temp_c" in df.columns else float("nan"),
-        "temp_max": float(df["temp_c"].max()) if "temp_c" in df.columns else float("nan"),
+        "rows": float(len(climate_df)),
+        "missing_temp": _missing_rate(climate_df, "temp_c"),
+        "missing_humidity": _missing_rate(climate_df, "humidity"),
+        "missing_precip": _missing_rate(climate_df, "precip_mm"),
+        "temp_min": temp_min,
+        "temp_max": temp_max,
     }
     return summary
 
@@ -35,7 +48,7 @@ def assert_quality(
     gps_df: pd.DataFrame,
     climate_df: pd.DataFrame,
     max_missing_rate: float = 0.1,
-) -> None:
+) -> Tuple[Dict[str, float], Dict[str, float]]:
     gps_summary = gps_quality_summary(gps_df)
     climate_summary = climate_quality_summary(climate_df)
 
@@ -45,3 +58,5 @@ def assert_quality(
         raise ValueError("GPS longitude missing rate exceeds limit")
     if climate_summary.get("missing_temp", 0) > max_missing_rate:
         raise ValueError("Climate temperature missing rate exceeds limit")
+    # Returned so callers can report the summaries without recomputing them.
+    return gps_summary, climate_summary
@@ -1,15 +1,35 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed, parallel_config
 from scipy import stats
 from sklearn.metrics import average_precision_score, f1_score, precision_score, recall_score, roc_auc_score
-from sklearn.model_selection import StratifiedKFold
+from sklearn.model_selection import StratifiedKFold, cross_validate
 
 from .modeling import FeatureSpec, build_features
-from .utils import haversine_km
+from .utils import haversine_km_vec
+
+_CV_METRICS = ("roc_auc", "average_precision", "f1", "precision", "recall")
+
+
+def _fold_scores(model, X_test: pd.DataFrame, y_test: pd.Series) -> Dict[str, float]:
+    probs = model.predict_proba(X_test)[:, 1]
+    preds = probs >= 0.5
+    return {
+        "roc_auc": roc_auc_score(y_test, probs),
+        "average_precision": average_precision_score(y_test, probs),
+        "f1": f1_score(y_test, preds, zero_division=0),
+        "precision": precision_score(y_test, preds, zero_division=0),
+        "recall": recall_score(y_test, preds, zero_division=0),
+    }
+
+
+def _single_threaded(model):
+    # Folds and bootstrap fits already run in parallel; nested threads would oversubscribe the cores.
+    return model.set_params(n_jobs=1)
 
 
 def cross_validate_model(
@@ -17,27 +37,29 @@ def cross_validate_model(
     thresholds: Dict[str, float],
     model_builder,
     n_splits: int = 5,
+    n_jobs: int = -1,
 ) -> Dict[str, float]:
     X, spec = build_features(labeled_df, thresholds)
-    y = labeled_df["is_refugia_point"].astype(int)
+    y = labeled_df["is_refugia_point"].astype(np.int8)
 
     if y.nunique() < 2:
         raise ValueError("Both classes are required for cross-validation")
 
-    metrics = {"roc_auc": [], "average_precision": [], "f1": [], "precision": [], "recall": []}
     splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
-    for train_idx, test_idx in splitter.split(X, y):
-        model = model_builder()
-        model.fit(X.iloc[train_idx], y.iloc[train_idx])
-        probs = model.predict_proba(X.iloc[test_idx])[:, 1]
-        preds = probs >= 0.5
-        metrics["roc_auc"].append(roc_auc_score(y.iloc[test_idx], probs))
-        metrics["average_precision"].append(average_precision_score(y.iloc[test_idx], probs))
-        metrics["f1"].append(f1_score(y.iloc[test_idx], preds, zero_division=0))
-        metrics["precision"].append(precision_score(y.iloc[test_idx], preds, zero_division=0))
-        metrics["recall"].append(recall_score(y.iloc[test_idx], preds, zero_division=0))
-
-    return {key: float(np.mean(values)) for key, values in metrics.items()}
+    # Folds share X in memory on threads; the forest fit releases the GIL.
+    with parallel_config(backend="threading"):
+        # A failing fold must abort, not turn into NaN metrics in the report.
+        scores = cross_validate(
+            _single_threaded(model_builder()),
+            X,
+            y,
+            cv=splitter,
+            scoring=_fold_scores,
+            n_jobs=n_jobs,
+            error_score="raise",
+        )
+
+    return {key: float(np.mean(scores[f"test_{key}"])) for key in _CV_METRICS}
 
 
 def refugia_vs_random_tests(labeled_df: pd.DataFrame) -> Dict[str, float]:
@@ -48,7 +70,7 @@ def refugia_vs_random_tests(labeled_df: pd.DataFrame) -> Dict[str, float]:
 
     t_stat, t_p = stats.ttest_ind(refugia["temp_c"], non_refugia["temp_c"], equal_var=False)
 
-    species_groups = [group["temp_c"].values for _, group in labeled_df.groupby("species")]
+    species_groups = [group["temp_c"].values for _, group in labeled_df.groupby("species", observed=True)]
     if len(species_groups) > 1:
         f_stat, f_p = stats.f_oneway(*species_groups)
     else:
@@ -71,17 +93,23 @@ def spatial_consistency(clusters_df: pd.DataFrame, events_df: pd.DataFrame) -> D
         return {"mean_centroid_shift_km": float("nan"), "median_centroid_shift_km": float("nan")}
 
     events["year"] = events["timestamp"].dt.year
-    distances = []
-    for cluster_id, group in events.groupby("cluster_id"):
-        if group["year"].nunique() < 2:
-            continue
-        centroids = group.groupby("year").agg(lat=("lat", "mean"), lon=("lon", "mean")).reset_index()
-        for idx in range(1, len(centroids)):
-            prev = centroids.iloc[idx - 1]
-            curr = centroids.iloc[idx]
-            distances.append(haversine_km(prev["lat"], prev["lon"], curr["lat"], curr["lon"]))
-
-    if not distances:
+    # Only clusters seen in at least two years can shift, so drop the rest before aggregating.
+    years_per_cluster = events.groupby("cluster_id")["year"].transform("nunique")
+    events = events[years_per_cluster.to_numpy() >= 2]
+    if events.empty:
+        return {"mean_centroid_shift_km": float("nan"), "median_centroid_shift_km": float("nan")}
+
+    centroids = events.groupby(["cluster_id", "year"], as_index=False).agg(lat=("lat", "mean"), lon=("lon", "mean"))
+    previous = centroids.groupby("cluster_id", sort=False)[["lat", "lon"]].shift()
+    has_previous = previous["lat"].notna().to_numpy()
+    distances = haversine_km_vec(
+        previous["lat"].to_numpy()[has_previous],
+        previous["lon"].to_numpy()[has_previous],
+        centroids["lat"].to_numpy()[has_previous],
+        centroids["lon"].to_numpy()[has_previous],
+    )
+
+    if len(distances) == 0:
         return {"mean_centroid_shift_km": float("nan"), "median_centroid_shift_km": float("nan")}
 
     return {
@@ -97,6 +125,9 @@ def bootstrap_uncertainty(
     model_builder,
     spec: FeatureSpec,
     n_bootstrap: int = 30,
+    X: Optional[pd.DataFrame] = None,
+    y: Optional[pd.Series] = None,
+    n_jobs: int = -1,
 ) -> pd.DataFrame:
     if climate_df.empty:
         return pd.DataFrame()
@@ -110,17 +141,24 @@ def bootstrap_uncertainty(
         climate_sample["species"] = climate_sample["species"].fillna(default_species)
     X_pred, _ = build_features(climate_sample, thresholds, species_levels=spec.species_levels)
     X_pred = X_pred.reindex(columns=spec.columns, fill_value=0)
+    X_pred_arr = np.ascontiguousarray(X_pred.to_numpy(dtype=np.float32))
 
-    preds = []
-    y = labeled_df["is_refugia_point"].astype(int)
-    X, _ = build_features(labeled_df, thresholds, species_levels=spec.species_levels)
+    # Callers that already built the training matrix (train_model returns it) skip rebuilding it here.
+    if X is None or y is None:
+        X, _ = build_features(labeled_df, thresholds, species_levels=spec.species_levels)
+        y = labeled_df["is_refugia_point"]
     X = X.reindex(columns=spec.columns, fill_value=0)
+    y_arr = np.asarray(y, dtype=np.int8)
+    X_arr = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+
+    def fit_one(seed: int) -> np.ndarray:
+        sample_idx = np.random.default_rng(seed).choice(len(X_arr), size=len(X_arr), replace=True)
+        model = _single_threaded(model_builder())
+        model.fit(X_arr[sample_idx], y_arr[sample_idx])
+        return model.predict_proba(X_pred_arr)[:, 1]
 
-    for idx in range(n_bootstrap):
-        sample_idx = np.random.choice(len(X), size=len(X), replace=True)
-        model = model_builder()
-        model.fit(X.iloc[sample_idx], y.iloc[sample_idx])
-        preds.append(model.predict_proba(X_pred)[:, 1])
+    # Tree fitting releases the GIL, so threads parallelize without pickling the training data.
+    preds = Parallel(n_jobs=n_jobs, backend="threading")(delayed(fit_one)(seed) for seed in range(n_bootstrap))
 
     pred_array = np.vstack(preds)
     climate_sample["prediction_mean"] = pred_array.mean(axis=0)
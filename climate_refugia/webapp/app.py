@@ -1,17 +1,111 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
+from typing import List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import streamlit as st
 import folium
 from folium.plugins import HeatMap
 
 
-def load_parquet(path: Path) -> pd.DataFrame:
+HEAT_COLUMNS = ["species", "heat_event_id", "temp_c", "lat", "lon"]
+FUTURE_COLUMNS = ["species", "lat", "lon", "refugia_probability", "is_refugia_pred"]
+CATEGORICAL_COLUMNS = ("species", "dominant_species", "study_name")
+
+
+def _arrow_dtype(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    # Columns stay Arrow-backed without a NumPy copy; dictionaries still decode to pandas categoricals.
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+@st.cache_data(show_spinner=False)
+def _read_parquet_cached(
+    path_str: str,
+    mtime: float,
+    columns: Optional[Tuple[str, ...]],
+    species: Optional[Tuple[str, ...]],
+    species_column: str,
+) -> pd.DataFrame:
+    # mtime is part of the cache key so a re-run pipeline invalidates stale frames.
+    filters = None
+    if species is not None and species_column in pq.read_schema(path_str).names:
+        # Pushed down to the parquet scan, so row groups without the selected species are skipped.
+        filters = [(species_column, "in", list(species))]
+    table = pq.read_table(path_str, columns=list(columns) if columns is not None else None, filters=filters)
+    df = table.to_pandas(types_mapper=_arrow_dtype)
+    # Repeated labels are held once as categories, so isin/groupby/unique work on integer codes.
+    return df.astype({
+        column: "category"
+        for column in CATEGORICAL_COLUMNS
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype)
+    })
+
+
+def load_parquet(
+    path: Path,
+    columns: Optional[List[str]] = None,
+    species: Optional[List[str]] = None,
+    species_column: str = "species",
+) -> pd.DataFrame:
     if not path.exists():
         return pd.DataFrame()
-    return pd.read_parquet(path)
+    return _read_parquet_cached(
+        str(path),
+        path.stat().st_mtime,
+        tuple(columns) if columns is not None else None,
+        tuple(species) if species else None,
+        species_column,
+    )
+
+
+FUTURE_PREFIX = "future_refugia_"
+FUTURE_SUFFIX = ".parquet"
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def list_scenarios(outputs_dir_str: str) -> List[str]:
+    if not os.path.isdir(outputs_dir_str):
+        return []
+    with os.scandir(outputs_dir_str) as entries:
+        return sorted(
+            entry.name[len(FUTURE_PREFIX):-len(FUTURE_SUFFIX)]
+            for entry in entries
+            if entry.name.startswith(FUTURE_PREFIX) and entry.name.endswith(FUTURE_SUFFIX)
+        )
+
+
+def _point_features(latitudes: List[float], longitudes: List[float], **properties: List) -> dict:
+    names = list(properties)
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": dict(zip(names, values)),
+            }
+            for lat, lon, *values in zip(latitudes, longitudes, *properties.values())
+        ],
+    }
+
+
+def _add_circle_layer(features: dict, radius: int, fill_opacity: float) -> folium.GeoJson:
+    # One GeoJSON layer is rendered client-side in a single pass instead of one marker object per row.
+    return folium.GeoJson(
+        features,
+        marker=folium.CircleMarker(radius=radius, fill=True, fill_opacity=fill_opacity),
+        style_function=lambda feature: {
+            "color": feature["properties"]["color"],
+            "fillColor": feature["properties"]["color"],
+            "fillOpacity": fill_opacity,
+        },
+        popup=folium.GeoJsonPopup(fields=["popup"], labels=False),
+    )
 
 
 def build_map(
@@ -28,36 +122,57 @@ def build_map(
     fmap = folium.Map(location=center, zoom_start=6, tiles="CartoDB positron")
 
     if not base_df.empty:
-        heat_points = base_df[["lat", "lon"]].dropna().values.tolist()
+        # One float64 block instead of boxing every coordinate; HeatMap validates array rows directly.
+        heat_points = base_df[["lat", "lon"]].to_numpy(dtype=np.float64, na_value=np.nan)
+        heat_points = heat_points[~np.isnan(heat_points).any(axis=1)]
         HeatMap(heat_points, radius=12, blur=8, min_opacity=0.3).add_to(fmap)
 
     if not clusters_df.empty:
-        for _, row in clusters_df.iterrows():
-            color = "green" if row.get("is_refugia", False) else "orange"
-            folium.CircleMarker(
-                location=[row["centroid_lat"], row["centroid_lon"]],
-                radius=6,
-                color=color,
-                fill=True,
-                fill_opacity=0.7,
-                popup=f"Cluster {row['cluster_id']} | Individuals {row['num_individuals']}",
-            ).add_to(fmap)
+        is_refugia = clusters_df["is_refugia"] if "is_refugia" in clusters_df.columns else [False] * len(clusters_df)
+        cluster_features = _point_features(
+            clusters_df["centroid_lat"].tolist(),
+            clusters_df["centroid_lon"].tolist(),
+            color=["green" if flag else "orange" for flag in is_refugia],
+            popup=[
+                f"Cluster {cluster_id} | Individuals {num_individuals}"
+                for cluster_id, num_individuals in zip(clusters_df["cluster_id"], clusters_df["num_individuals"])
+            ],
+        )
+        _add_circle_layer(cluster_features, radius=6, fill_opacity=0.7).add_to(fmap)
 
     if show_future and not future_df.empty:
-        future_points = future_df[future_df["is_refugia_pred"]]
-        for _, row in future_points.iterrows():
-            folium.CircleMarker(
-                location=[row["lat"], row["lon"]],
-                radius=4,
-                color="blue",
-                fill=True,
-                fill_opacity=0.6,
-                popup=f"{row['species']} | Prob {row['refugia_probability']:.2f}",
-            ).add_to(fmap)
+        refugia_mask = future_df["is_refugia_pred"].to_numpy(dtype=bool)
+        future_points = future_df.loc[refugia_mask, ["lat", "lon", "species", "refugia_probability"]]
+        future_features = _point_features(
+            future_points["lat"].tolist(),
+            future_points["lon"].tolist(),
+            color=["blue"] * len(future_points),
+            popup=[
+                f"{species} | Prob {probability:.2f}"
+                for species, probability in zip(future_points["species"], future_points["refugia_probability"])
+            ],
+        )
+        _add_circle_layer(future_features, radius=4, fill_opacity=0.6).add_to(fmap)
 
     return fmap
 
 
+def _mtime(path: Path) -> float:
+    return path.stat().st_mtime if path.exists() else 0.0
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def render_map_html(
+    _heat_df: pd.DataFrame,
+    _clusters_df: pd.DataFrame,
+    _future_df: pd.DataFrame,
+    show_future: bool,
+    signature: Tuple,
+) -> str:
+    # Underscored frames are not hashed; the signature (species filter plus source files and mtimes) stands in for them.
+    return build_map(_heat_df, _clusters_df, _future_df, show_future)._repr_html_()
+
+
 def main() -> None:
     st.set_page_config(page_title="Climate Refugia Explorer", layout="wide")
     st.title("Climate Refugia Explorer")
@@ -68,42 +183,43 @@ def main() -> None:
             value=str(Path(__file__).resolve().parents[2] / "outputs"),
         )
     )
-    aligned_df = load_parquet(outputs_dir / "aligned_data.parquet")
-    heat_df = load_parquet(outputs_dir / "heat_events.parquet")
-    clusters_df = load_parquet(outputs_dir / "refugia_clusters.parquet")
+    heat_path = outputs_dir / "heat_events.parquet"
 
-    future_files = sorted(outputs_dir.glob("future_refugia_*.parquet"))
-    scenarios = [path.stem.replace("future_refugia_", "") for path in future_files]
+    scenarios = list_scenarios(str(outputs_dir))
 
     st.sidebar.subheader("Filters")
-    species_options = sorted(heat_df["species"].unique()) if not heat_df.empty else []
+    species_df = load_parquet(heat_path, columns=["species"])
+    species_options = sorted(species_df["species"].unique()) if not species_df.empty else []
     selected_species = st.sidebar.multiselect("Species", species_options, default=species_options)
 
+    # Only the heat and future columns the map, summary and tables use are read; clusters are shown in full.
+    heat_df = load_parquet(heat_path, columns=HEAT_COLUMNS, species=selected_species)
+    clusters_path = outputs_dir / "refugia_clusters.parquet"
+    clusters_df = load_parquet(clusters_path, species=selected_species, species_column="dominant_species")
+
     show_future = st.sidebar.checkbox("Show future refugia", value=False)
     future_df = pd.DataFrame()
+    future_path: Optional[Path] = None
     if show_future and scenarios:
         selected_scenario = st.sidebar.selectbox("Scenario", scenarios, index=0)
-        future_path = outputs_dir / f"future_refugia_{selected_scenario}.parquet"
-        future_df = load_parquet(future_path)
-
-    if selected_species:
-        heat_df = heat_df[heat_df["species"].isin(selected_species)]
-        if "dominant_species" in clusters_df.columns:
-            clusters_df = clusters_df[clusters_df["dominant_species"].isin(selected_species)]
-        if not future_df.empty:
-            future_df = future_df[future_df["species"].isin(selected_species)]
+        future_path = outputs_dir / f"{FUTURE_PREFIX}{selected_scenario}{FUTURE_SUFFIX}"
+        future_df = load_parquet(future_path, columns=FUTURE_COLUMNS, species=selected_species)
 
     st.subheader("Refugia Map")
-    fmap = build_map(heat_df, clusters_df, future_df, show_future)
-    st.components.v1.html(fmap._repr_html_(), height=600, scrolling=False)
+    map_signature = (
+        tuple(selected_species),
+        tuple((str(path), _mtime(path)) for path in (heat_path, clusters_path, future_path) if path is not None),
+    )
+    map_html = render_map_html(heat_df, clusters_df, future_df, show_future, map_signature)
+    st.components.v1.html(map_html, height=600, scrolling=False)
 
     st.subheader("Heat Event Summary")
     if heat_df.empty:
         st.info("No heat events detected.")
     else:
-        summary = heat_df.groupby("species").agg(
+        summary = heat_df.groupby("species", observed=True).agg(
             points=("heat_event_id", "count"),
-            events=("heat_event_id", lambda x: x.nunique()),
+            events=("heat_event_id", "nunique"),
             mean_temp=("temp_c", "mean"),
         ).reset_index()
         st.dataframe(summary, use_container_width=True)
@@ -10,6 +10,20 @@ import pandas as pd
 from climate_refugia.reporting import build_report
 
 
+# The report only counts rows and summarizes a couple of columns, so read just those.
+REQUIRED_COLS = {
+    "aligned": ["timestamp"],
+    "events": ["heat_event_id"],
+    "clusters": ["is_refugia"],
+    "uncertainty": ["prediction_std"],
+}
+
+
+def read_report_table(path: Path, name: str) -> pd.DataFrame:
+    # Arrow-backed columns skip the NumPy conversion; the report only counts and averages them.
+    return pd.read_parquet(path, engine="pyarrow", dtype_backend="pyarrow", columns=REQUIRED_COLS[name])
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build a refugia report")
     parser.add_argument("--aligned-path", type=Path, required=True)
@@ -37,9 +51,9 @@ def parse_experiments(arg_list: list[str] | None) -> dict[str, Path]:
 
 def main() -> None:
     args = parse_args()
-    aligned_df = pd.read_parquet(args.aligned_path)
-    events_df = pd.read_parquet(args.events_path)
-    clusters_df = pd.read_parquet(args.clusters_path)
+    aligned_df = read_report_table(args.aligned_path, "aligned")
+    events_df = read_report_table(args.events_path, "events")
+    clusters_df = read_report_table(args.clusters_path, "clusters")
 
     validation_payload = json.loads(args.validation_path.read_text())
     validation_metrics = validation_payload.get("cross_validation", {})
@@ -48,7 +62,7 @@ def main() -> None:
 
     uncertainty_df = None
     if args.uncertainty_path:
-        uncertainty_df = pd.read_parquet(args.uncertainty_path)
+        uncertainty_df = read_report_table(args.uncertainty_path, "uncertainty")
 
     experiments = parse_experiments(args.experiment)
 
@@ -2,18 +2,24 @@
 from __future__ import annotations
 
 import argparse
-import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import requests
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from climate_refugia.data_sources.era5 import Era5Request, download_era5, era5_to_dataframe
-from climate_refugia.data_sources.movebank import MovebankError, download_movebank_events, load_movebank_csv
-
-MOVE_BANK_URL = "https://www.movebank.org/movebank/service/direct-read"
+from climate_refugia.data_sources.movebank import (
+    MovebankError,
+    download_movebank_events,
+    fetch_movebank_studies_cached,
+    load_movebank_csv,
+)
+from climate_refugia.utils import write_parquet_table
 
 DEFAULT_STUDY_IDS = [
     736029750,  # ThermochronTracking Elephants Kruger 2007
@@ -23,6 +29,8 @@ DEFAULT_STUDY_IDS = [
     4901146318, # White-bearded wildebeest - Greater Mara Ecosystem
 ]
 
+FLOAT32_COLUMNS = ("lat", "lon", "temp_c", "humidity", "precip_mm")
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Download Movebank and ERA5 datasets for the project")
@@ -37,17 +45,6 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def fetch_study_metadata(username: str, password: str) -> pd.DataFrame:
-    response = requests.get(
-        MOVE_BANK_URL,
-        params={"entity_type": "study", "format": "csv"},
-        auth=(username, password),
-        timeout=120,
-    )
-    response.raise_for_status()
-    return pd.read_csv(io.StringIO(response.text))
-
-
 def build_area_bounds(df: pd.DataFrame, buffer_deg: float) -> List[float]:
     north = float(df["lat"].max() + buffer_deg)
     south = float(df["lat"].min() - buffer_deg)
@@ -56,6 +53,116 @@ def build_area_bounds(df: pd.DataFrame, buffer_deg: float) -> List[float]:
     return [north, west, south, east]
 
 
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.astype({column: np.float32 for column in FLOAT32_COLUMNS if column in df.columns})
+    for column in ("study_id", "tag_id"):
+        if column in df.columns and pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def combine_tables(tables: List[pa.Table], sort_keys: List[str]) -> pa.Table:
+    # Studies may differ in columns and integer widths; missing columns become nulls and types widen.
+    combined = pa.concat_tables(tables, promote_options="permissive").unify_dictionaries()
+    # Per-study pandas metadata no longer describes the promoted schema.
+    combined = combined.replace_schema_metadata(None)
+    for column in ("species", "study_name"):
+        if column in combined.column_names and not pa.types.is_dictionary(combined.schema.field(column).type):
+            combined = combined.set_column(
+                combined.schema.get_field_index(column), column, pc.dictionary_encode(combined[column])
+            )
+    # Arrow cannot sort dictionary columns directly, so order on their decoded values.
+    keys = pa.table({
+        key: combined[key].cast(combined[key].type.value_type)
+        if pa.types.is_dictionary(combined[key].type)
+        else combined[key]
+        for key in sort_keys
+    })
+    # Clustering rows by the usual filter keys gives each row group tight min/max statistics to prune on.
+    return combined.take(pc.sort_indices(keys, sort_keys=[(key, "ascending") for key in sort_keys]))
+
+
+def process_study(
+    study_id: int,
+    args: argparse.Namespace,
+    metadata_subset: pd.DataFrame,
+    username: str,
+    password: str,
+    movebank_dir: Path,
+    era5_dir: Path,
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], Optional[Tuple[int, str]]]:
+    study_row = metadata_subset[metadata_subset["id"] == study_id]
+    study_name = study_row["name"].iloc[0] if not study_row.empty else f"study_{study_id}"
+    taxon_ids = study_row["taxon_ids"].iloc[0] if not study_row.empty else None
+    gps_path = movebank_dir / f"study_{study_id}.csv"
+    if not gps_path.exists():
+        try:
+            download_movebank_events(
+                output_path=gps_path,
+                study_id=study_id,
+                username=username,
+                password=password,
+            )
+        except MovebankError:
+            try:
+                download_movebank_events(
+                    output_path=gps_path,
+                    study_id=study_id,
+                    username=username,
+                    password=password,
+                    attributes=[
+                        "timestamp",
+                        "location_lat",
+                        "location_long",
+                        "individual_id",
+                        "tag_id",
+                    ],
+                )
+            except MovebankError as exc2:
+                if args.skip_unaccepted:
+                    return None, None, (study_id, study_name)
+                raise SystemExit(f"Study {study_id} download failed: {exc2}") from exc2
+
+    gps_df = load_movebank_csv(
+        gps_path,
+        require_species=False,
+        species_fallback=str(taxon_ids) if taxon_ids is not None and str(taxon_ids) != "nan" else None,
+    )
+    ts_min, ts_max = gps_df["timestamp"].agg(["min", "max"])
+    if args.start or args.end:
+        start = pd.to_datetime(args.start, utc=True) if args.start else ts_min
+        end = pd.to_datetime(args.end, utc=True) if args.end else ts_max
+        gps_df = gps_df.loc[gps_df["timestamp"].between(start, end, inclusive="both")]
+        if gps_df.empty:
+            return None, None, (study_id, f"{study_name} (no data in range)")
+        ts_min, ts_max = gps_df["timestamp"].agg(["min", "max"])
+    gps_df["study_id"] = study_id
+    gps_df["study_name"] = study_name
+
+    if args.skip_era5:
+        return gps_df, None, None
+
+    area = build_area_bounds(gps_df, args.buffer_deg)
+    start_time = ts_min.strftime("%Y-%m-%d")
+    end_time = ts_max.strftime("%Y-%m-%d")
+    era5_path = era5_dir / f"era5_study_{study_id}.nc"
+
+    if not era5_path.exists():
+        request = Era5Request(
+            start=pd.to_datetime(start_time, utc=True).to_pydatetime(),
+            end=pd.to_datetime(end_time, utc=True).to_pydatetime(),
+            area=area,
+            variables=["2m_temperature", "2m_dewpoint_temperature", "total_precipitation"],
+            grid=args.grid,
+            output_path=era5_path,
+        )
+        download_era5(request)
+
+    climate_df = era5_to_dataframe(era5_path)
+    climate_df["study_id"] = study_id
+    return gps_df, climate_df, None
+
+
 def main() -> None:
     username = os.getenv("MOVEBANK_USERNAME")
     password = os.getenv("MOVEBANK_PASSWORD")
@@ -69,102 +176,47 @@ def main() -> None:
     movebank_dir.mkdir(parents=True, exist_ok=True)
     era5_dir.mkdir(parents=True, exist_ok=True)
 
-    study_metadata = fetch_study_metadata(username, password)
+    outputs_dir = output_dir.parent / "outputs"
+    study_metadata = fetch_movebank_studies_cached(username, password, outputs_dir / "movebank_studies_cache.parquet")
     metadata_subset = study_metadata[study_metadata["id"].isin(args.study_ids)].copy()
-    metadata_path = output_dir.parent / "outputs" / "movebank_study_metadata.csv"
+    metadata_path = outputs_dir / "movebank_study_metadata.csv"
     metadata_path.parent.mkdir(parents=True, exist_ok=True)
     metadata_subset.to_csv(metadata_path, index=False)
 
-    gps_frames = []
-    climate_frames = []
+    gps_tables = []
+    climate_tables = []
     skipped = []
 
-    for study_id in args.study_ids:
-        study_row = metadata_subset[metadata_subset["id"] == study_id]
-        study_name = study_row["name"].iloc[0] if not study_row.empty else f"study_{study_id}"
-        taxon_ids = study_row["taxon_ids"].iloc[0] if not study_row.empty else None
-        gps_path = movebank_dir / f"study_{study_id}.csv"
-        if not gps_path.exists():
-            try:
-                download_movebank_events(
-                    output_path=gps_path,
-                    study_id=study_id,
-                    username=username,
-                    password=password,
-                )
-            except MovebankError:
-                try:
-                    download_movebank_events(
-                        output_path=gps_path,
-                        study_id=study_id,
-                        username=username,
-                        password=password,
-                        attributes=[
-                            "timestamp",
-                            "location_lat",
-                            "location_long",
-                            "individual_id",
-                            "tag_id",
-                        ],
-                    )
-                except MovebankError as exc2:
-                    if args.skip_unaccepted:
-                        skipped.append((study_id, study_name))
-                        continue
-                    raise SystemExit(f"Study {study_id} download failed: {exc2}") from exc2
-
-        gps_df = load_movebank_csv(
-            gps_path,
-            require_species=False,
-            species_fallback=str(taxon_ids) if taxon_ids is not None and str(taxon_ids) != "nan" else None,
-        )
-        if args.start or args.end:
-            start = pd.to_datetime(args.start, utc=True) if args.start else gps_df["timestamp"].min()
-            end = pd.to_datetime(args.end, utc=True) if args.end else gps_df["timestamp"].max()
-            gps_df = gps_df[(gps_df["timestamp"] >= start) & (gps_df["timestamp"] <= end)]
-            if gps_df.empty:
-                skipped.append((study_id, f"{study_name} (no data in range)"))
-                continue
-        gps_df["study_id"] = study_id
-        gps_df["study_name"] = study_name
-        gps_frames.append(gps_df)
-
-        if args.skip_era5:
-            continue
-
-        area = build_area_bounds(gps_df, args.buffer_deg)
-        start_time = gps_df["timestamp"].min().strftime("%Y-%m-%d")
-        end_time = gps_df["timestamp"].max().strftime("%Y-%m-%d")
-        era5_path = era5_dir / f"era5_study_{study_id}.nc"
-
-        if not era5_path.exists():
-            request = Era5Request(
-                start=pd.to_datetime(start_time, utc=True).to_pydatetime(),
-                end=pd.to_datetime(end_time, utc=True).to_pydatetime(),
-                area=area,
-                variables=["2m_temperature", "2m_dewpoint_temperature", "total_precipitation"],
-                grid=args.grid,
-                output_path=era5_path,
+    # Studies are dominated by Movebank and CDS latency, so their downloads overlap on threads.
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(args.study_ids)))) as executor:
+        futures = [
+            executor.submit(
+                process_study, study_id, args, metadata_subset, username, password, movebank_dir, era5_dir
             )
-            download_era5(request)
-
-        climate_df = era5_to_dataframe(era5_path)
-        climate_df["study_id"] = study_id
-        climate_frames.append(climate_df)
-
-    if not gps_frames:
+            for study_id in args.study_ids
+        ]
+        for future in futures:
+            gps_df, climate_df, skipped_study = future.result()
+            if skipped_study is not None:
+                skipped.append(skipped_study)
+            if gps_df is not None:
+                gps_tables.append(pa.Table.from_pandas(downcast_numeric(gps_df), preserve_index=False))
+            if climate_df is not None:
+                climate_tables.append(pa.Table.from_pandas(downcast_numeric(climate_df), preserve_index=False))
+
+    if not gps_tables:
         raise SystemExit("No Movebank datasets were downloaded. Check license acceptance and study IDs.")
 
-    combined_gps = pd.concat(gps_frames, ignore_index=True)
+    combined_gps = combine_tables(gps_tables, ["study_id", "species", "timestamp"])
     combined_path = output_dir / "movebank_events.parquet"
-    combined_gps.to_parquet(combined_path, index=False)
+    write_parquet_table(combined_gps, combined_path)
 
-    if climate_frames:
-        combined_climate = pd.concat(climate_frames, ignore_index=True)
+    if climate_tables:
+        combined_climate = combine_tables(climate_tables, ["study_id", "timestamp"])
         climate_path = output_dir / "era5_combined.parquet"
-        combined_climate.to_parquet(climate_path, index=False)
+        write_parquet_table(combined_climate, climate_path)
 
-    data_avail_path = output_dir.parent / "outputs" / "data_availability.md"
+    data_avail_path = outputs_dir / "data_availability.md"
     lines = ["# Data Availability", "", "## Movebank Studies"]
     for _, row in metadata_subset.iterrows():
         lines.append(f"- {row['name']} (Movebank study ID {row['id']}, license {row.get('license_type', 'NA')})")
@@ -177,7 +229,7 @@ def main() -> None:
     data_avail_path.write_text("\n".join(lines))
 
     print(f"Movebank combined data: {combined_path}")
-    if climate_frames:
+    if climate_tables:
         print(f"ERA5 combined data: {output_dir / 'era5_combined.parquet'}")
     print(f"Study metadata: {metadata_path}")
     print(f"Data availability: {data_avail_path}")
@@ -13,6 +13,14 @@ from climate_refugia.experiments import (
     sensitivity_analysis,
 )
 from climate_refugia.config import PipelineConfig
+from climate_refugia.utils import write_parquet
+
+
+REQUIRED_COLS = {
+    "aligned": ["timestamp", "individual_id", "species", "lat", "lon", "temp_c"],
+    "clustered_heat": ["timestamp", "individual_id", "species", "lat", "lon", "temp_c", "heat_event_id", "cluster_id"],
+    "future": ["species", "lat", "lon", "refugia_probability"],
+}
 
 
 def parse_args() -> argparse.Namespace:
@@ -46,16 +54,15 @@ def main() -> None:
     if args.data_dir:
         config.data_dir = args.data_dir
 
-    aligned_df = pd.read_parquet(args.aligned_path)
-    heat_df = pd.read_parquet(args.clustered_heat_path)
-    clusters_df = pd.read_parquet(args.clusters_path)
+    aligned_df = pd.read_parquet(args.aligned_path, engine="pyarrow", columns=REQUIRED_COLS["aligned"])
+    heat_df = pd.read_parquet(args.clustered_heat_path, engine="pyarrow", columns=REQUIRED_COLS["clustered_heat"])
 
     args.outputs_dir.mkdir(parents=True, exist_ok=True)
 
     years = sorted(aligned_df["timestamp"].dt.year.unique())
     heatwave_df = heatwave_response_analysis(heat_df, years=years, eps_km=args.clustering_eps_km, min_samples=args.clustering_min_samples)
     heatwave_path = args.outputs_dir / "experiment_heatwave_response.parquet"
-    heatwave_df.to_parquet(heatwave_path, index=False)
+    write_parquet(heatwave_df, heatwave_path)
 
     sensitivity_df = sensitivity_analysis(
         aligned_df,
@@ -66,7 +73,7 @@ def main() -> None:
         min_samples=args.clustering_min_samples,
     )
     sensitivity_path = args.outputs_dir / "experiment_sensitivity.parquet"
-    sensitivity_df.to_parquet(sensitivity_path, index=False)
+    write_parquet(sensitivity_df, sensitivity_path)
 
     model_comp = model_comparison_empirical_vs_climate(heat_df)
     model_comp_path = args.outputs_dir / "experiment_model_comparison.json"
@@ -78,11 +85,11 @@ def main() -> None:
         for idx in range(len(scenarios) - 1):
             scenario_a = scenarios[idx]
             scenario_b = scenarios[idx + 1]
-            df_a = pd.read_parquet(future[scenario_a])
-            df_b = pd.read_parquet(future[scenario_b])
+            df_a = pd.read_parquet(future[scenario_a], engine="pyarrow", columns=REQUIRED_COLS["future"])
+            df_b = pd.read_parquet(future[scenario_b], engine="pyarrow", columns=REQUIRED_COLS["future"])
             shift_df = climate_scenario_shift(df_a, df_b)
             shift_path = args.outputs_dir / f"experiment_climate_shift_{scenario_a}_vs_{scenario_b}.parquet"
-            shift_df.to_parquet(shift_path, index=False)
+            write_parquet(shift_df, shift_path)
 
     print(f"Outputs written to {args.outputs_dir}")
 
@@ -5,7 +5,9 @@ import argparse
 from pathlib import Path
 
 from climate_refugia.config import PipelineConfig
+from climate_refugia.modeling import MODEL_BACKENDS
 from climate_refugia.pipeline import run_pipeline
+from climate_refugia.utils import limit_threads, n_jobs_arg
 
 
 def parse_args() -> argparse.Namespace:
@@ -21,8 +23,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--clustering-min-samples", type=int, default=5)
     parser.add_argument("--model-n-estimators", type=int, default=300)
     parser.add_argument("--model-max-depth", type=int, default=12)
+    parser.add_argument("--model-backend", choices=MODEL_BACKENDS, default="sklearn")
+    parser.add_argument("--n-jobs", type=n_jobs_arg, default=-1, help="Worker threads, -1 for all cores")
     parser.add_argument("--time-tolerance-minutes", type=int, default=60)
     parser.add_argument("--probability-threshold", type=float, default=0.7)
+    parser.add_argument("--use-polars", action="store_true", help="Use polars for alignment and threshold quantiles")
     return parser.parse_args()
 
 
@@ -51,7 +56,12 @@ def main() -> None:
     config.clustering_min_samples = args.clustering_min_samples
     config.model_n_estimators = args.model_n_estimators
     config.model_max_depth = args.model_max_depth
+    config.model_backend = args.model_backend
+    config.model_n_jobs = args.n_jobs
     config.time_tolerance_minutes = args.time_tolerance_minutes
+    config.use_polars = args.use_polars
+
+    limit_threads(args.n_jobs)
 
     future_paths = parse_future(args.future_climate)
     outputs = run_pipeline(
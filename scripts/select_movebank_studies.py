@@ -2,20 +2,25 @@
 from __future__ import annotations
 
 import argparse
-import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
+import numpy as np
 import pandas as pd
 import requests
 
+from climate_refugia.data_sources.movebank import fetch_movebank_studies_cached, read_movebank_studies
+
 MOVE_BANK_URL = "https://www.movebank.org/movebank/service/direct-read"
+LICENSE_PROBE_WORKERS = 16
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Select Movebank studies with accepted licenses")
     parser.add_argument("--studies-csv", type=Path, default=Path("outputs/movebank_studies_accessible.csv"))
+    parser.add_argument("--studies-cache", type=Path, default=Path("outputs/movebank_studies_cache.parquet"))
     parser.add_argument("--max-studies", type=int, default=5)
     parser.add_argument("--min-individuals", type=int, default=5)
     parser.add_argument("--lat-min", type=float, default=-30.0)
@@ -30,17 +35,6 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def fetch_studies(username: str, password: str) -> pd.DataFrame:
-    response = requests.get(
-        MOVE_BANK_URL,
-        params={"entity_type": "study", "format": "csv"},
-        auth=(username, password),
-        timeout=120,
-    )
-    response.raise_for_status()
-    return pd.read_csv(io.StringIO(response.text))
-
-
 def is_license_accepted(study_id: int, username: str, password: str, timeout: int) -> bool:
     params = {
         "entity_type": "event",
@@ -61,14 +55,13 @@ def is_license_accepted(study_id: int, username: str, password: str, timeout: in
     if response.status_code != 200:
         response.close()
         return False
-    head = response.raw.read(200).decode("utf-8", errors="ignore").lower()
+    head = response.raw.read(200)
     response.close()
-    if not head:
+    # Only the CSV header line matters; check it as bytes without decoding the whole buffer.
+    first_line = head.splitlines()[0].lower() if head.strip(b"\r\n") else b""
+    if not first_line or first_line.startswith(b"<html"):
         return False
-    first_line = head.splitlines()[0] if head.splitlines() else head
-    if first_line.startswith("<html"):
-        return False
-    return "timestamp" in first_line and "location_lat" in first_line
+    return b"timestamp" in first_line and b"location_lat" in first_line
 
 
 def main() -> None:
@@ -79,40 +72,44 @@ def main() -> None:
         raise SystemExit("MOVEBANK_USERNAME and MOVEBANK_PASSWORD must be set")
 
     if args.studies_csv.exists():
-        studies_df = pd.read_csv(args.studies_csv)
+        studies_df = read_movebank_studies(args.studies_csv)
     else:
-        studies_df = fetch_studies(username, password)
-
-    for col in ["number_of_individuals", "main_location_lat", "main_location_long"]:
-        if col in studies_df.columns:
-            studies_df[col] = pd.to_numeric(studies_df[col], errors="coerce")
-
-    filtered = studies_df.copy()
-    filtered = filtered[filtered["main_location_lat"].between(args.lat_min, args.lat_max, inclusive="both")]
-    filtered = filtered[filtered["main_location_long"].between(args.lon_min, args.lon_max, inclusive="both")]
-    if args.require_gps and "sensor_type_ids" in filtered.columns:
-        filtered = filtered[filtered["sensor_type_ids"].astype(str).str.contains("GPS", case=False, na=False)]
-    if args.min_individuals and "number_of_individuals" in filtered.columns:
-        filtered = filtered[filtered["number_of_individuals"] >= args.min_individuals]
+        studies_df = fetch_movebank_studies_cached(username, password, args.studies_cache)
+
+    mask = studies_df["main_location_lat"].between(args.lat_min, args.lat_max, inclusive="both")
+    mask &= studies_df["main_location_long"].between(args.lon_min, args.lon_max, inclusive="both")
+    if args.require_gps and "sensor_type_ids" in studies_df.columns:
+        mask &= studies_df["sensor_type_ids"].astype(str).str.contains("GPS", case=False, na=False)
+    if args.min_individuals and "number_of_individuals" in studies_df.columns:
+        mask &= studies_df["number_of_individuals"] >= args.min_individuals
     if args.keywords:
-        keyword_mask = pd.Series(False, index=filtered.index)
-        name_lower = filtered["name"].astype(str).str.lower()
-        taxon_lower = filtered.get("taxon_ids", "").astype(str).str.lower()
-        for keyword in args.keywords:
-            kw = keyword.lower()
-            keyword_mask |= name_lower.str.contains(kw) | taxon_lower.str.contains(kw)
-        filtered = filtered[keyword_mask]
+        name_lower = studies_df["name"].astype(str).str.lower()
+        taxon_lower = studies_df.get("taxon_ids", pd.Series("", index=studies_df.index)).astype(str).str.lower()
+        mask &= np.logical_or.reduce([
+            name_lower.str.contains(kw, regex=False) | taxon_lower.str.contains(kw, regex=False)
+            for kw in (keyword.lower() for keyword in args.keywords)
+        ])
+    filtered = studies_df.loc[mask]
 
     filtered = filtered.sort_values("number_of_individuals", ascending=False)
     filtered = filtered.head(args.max_candidates)
 
     selected_rows: List[pd.Series] = []
-    for _, row in filtered.iterrows():
-        study_id = int(row["id"])
-        if is_license_accepted(study_id, username, password, args.timeout):
-            selected_rows.append(row)
-        if len(selected_rows) >= args.max_studies:
-            break
+    # Probes are network-bound, so they run concurrently; results are taken in candidate order
+    # and pending probes are cancelled once enough accepted studies are found.
+    executor = ThreadPoolExecutor(max_workers=LICENSE_PROBE_WORKERS)
+    try:
+        probes = [
+            (row, executor.submit(is_license_accepted, int(row["id"]), username, password, args.timeout))
+            for _, row in filtered.iterrows()
+        ]
+        for row, probe in probes:
+            if len(selected_rows) >= args.max_studies:
+                break
+            if probe.result():
+                selected_rows.append(row)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
     if not selected_rows:
         raise SystemExit("No studies found with accepted licenses in the filtered set")
@@ -2,12 +2,24 @@
 from __future__ import annotations
 
 import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 
 from climate_refugia.config import PipelineConfig
-from climate_refugia.modeling import save_model, train_model
+from climate_refugia.modeling import MODEL_BACKENDS, export_compiled_model, save_model, train_model
+from climate_refugia.utils import limit_threads, n_jobs_arg
+
+# Columns train_model reads: label_refugia_points needs coordinates, build_features the rest.
+HEAT_COLUMNS = ["timestamp", "species", "lat", "lon", "temp_c", "humidity", "precip_mm"]
+CLUSTER_COLUMNS = ["centroid_lat", "centroid_lon"]
+PRESORT_COLUMNS = ["temp_c", "lat", "lon", "timestamp", "humidity", "precip_mm"]
+MODEL_COMPRESS_METHODS = ["lz4", "zlib", "gzip", "bz2", "lzma", "xz"]
 
 
 def parse_args() -> argparse.Namespace:
@@ -18,31 +30,92 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--data-dir", type=Path, default=None)
     parser.add_argument("--model-n-estimators", type=int, default=300)
     parser.add_argument("--model-max-depth", type=int, default=12)
+    parser.add_argument("--model-backend", choices=MODEL_BACKENDS, default="sklearn")
     parser.add_argument("--model-random-state", type=int, default=42)
+    parser.add_argument("--n-jobs", type=n_jobs_arg, default=-1, help="Worker threads, -1 for all cores")
+    parser.add_argument(
+        "--presort-by",
+        choices=PRESORT_COLUMNS,
+        default=None,
+        help="Stable-sort heat points by this column before training (changes bootstrap draws, so models differ)",
+    )
+    parser.add_argument(
+        "--model-compress",
+        type=int,
+        default=3,
+        help="joblib compression level for the saved model (0-9, 0 writes it uncompressed)",
+    )
+    parser.add_argument(
+        "--model-compress-method",
+        choices=MODEL_COMPRESS_METHODS,
+        default="lz4",
+        help="joblib compressor used when --model-compress is above 0",
+    )
+    parser.add_argument(
+        "--mmap-features",
+        action="store_true",
+        help="Train from a float32 feature matrix memory-mapped from a temporary file next to --output",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Also compile the forest to a shared library next to --output (needs treelite, tl2cgen and gcc)",
+    )
     return parser.parse_args()
 
 
+def read_filtered(path: Path, columns: list[str], row_filter: pc.Expression) -> pd.DataFrame:
+    dataset = ds.dataset(path, format="parquet")
+    # Optional climate columns may be absent; build_features fills those itself.
+    present = [column for column in columns if column in dataset.schema.names]
+    # The scan applies the filter while decoding, so only kept rows of the selected columns are materialized.
+    table = dataset.to_table(columns=present, filter=row_filter)
+    # Arrow buffers are released column by column as pandas takes them over.
+    return table.to_pandas(types_mapper=pd.ArrowDtype, self_destruct=True, split_blocks=True)
+
+
 def main() -> None:
     args = parse_args()
+    limit_threads(args.n_jobs)
     config = PipelineConfig.default()
     if args.data_dir:
         config.data_dir = args.data_dir
 
-    heat_df = pd.read_parquet(args.heat_path)
-    clusters_df = pd.read_parquet(args.clusters_path)
+    # The two reads are independent and mostly I/O and decompression, so they overlap on threads.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        heat_future = executor.submit(
+            read_filtered, args.heat_path, HEAT_COLUMNS, pc.field("heat_event_id").is_valid()
+        )
+        refugia_future = executor.submit(
+            read_filtered, args.clusters_path, CLUSTER_COLUMNS, pc.field("is_refugia")
+        )
+        heat_points = heat_future.result()
+        refugia_df = refugia_future.result()
+
+    if args.presort_by is not None and args.presort_by in heat_points.columns:
+        # Keeps runs of similar split-feature values contiguous for the tree builder's memory access.
+        heat_points = heat_points.sort_values(args.presort_by, kind="stable", ignore_index=True)
 
     thresholds = config.load_species_thresholds()
-    heat_points = heat_df[heat_df["heat_event_id"].notna()].copy()
-    model, spec, _ = train_model(
-        heat_points,
-        clusters_df[clusters_df["is_refugia"]],
-        thresholds,
-        random_state=args.model_random_state,
-        n_estimators=args.model_n_estimators,
-        max_depth=args.model_max_depth,
-    )
-    save_model(model, spec, args.output)
-    print(f"Saved model to {args.output}")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=args.output.parent) if args.mmap_features else nullcontext() as cache_dir:
+        model, spec, _, X_train, _ = train_model(
+            heat_points,
+            refugia_df,
+            thresholds,
+            random_state=args.model_random_state,
+            n_estimators=args.model_n_estimators,
+            max_depth=args.model_max_depth,
+            backend=args.model_backend,
+            feature_cache=Path(cache_dir) / "features.npy" if cache_dir else None,
+            n_jobs=args.n_jobs,
+        )
+        compress = (args.model_compress_method, args.model_compress) if args.model_compress else 0
+        save_model(model, spec, args.output, compress=compress)
+        print(f"Saved model to {args.output}")
+        if args.compile:
+            library_path = export_compiled_model(model, X_train, args.output.with_suffix(".so"))
+            print(f"Compiled model to {library_path}")
 
 
 if __name__ == "__main__":
@@ -5,39 +5,61 @@ import argparse
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 
-from climate_refugia.data_sources.era5 import era5_to_dataframe
 from climate_refugia.data_sources.movebank import load_movebank_csv
 from climate_refugia.preprocessing import clean_climate, clean_gps
-from climate_refugia.quality_checks import assert_quality, climate_quality_summary, gps_quality_summary
+from climate_refugia.quality_checks import assert_quality
+from climate_refugia.utils import limit_threads, n_jobs_arg, read_csv
+
+# clean_gps and the quality summaries only look at these; rows without a fix are dropped by clean_gps anyway.
+GPS_COLUMNS = ["timestamp", "lat", "lon", "species", "individual_id", "speed_mps"]
+GPS_FILTER = pc.field("timestamp").is_valid() & pc.field("lat").is_valid() & pc.field("lon").is_valid()
+CLIMATE_COLUMN_TYPES = {column: pa.float64() for column in ("lat", "lon", "temp_c", "humidity", "precip_mm")}
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Validate GPS and climate inputs")
     parser.add_argument("--gps-path", type=Path, required=True)
     parser.add_argument("--climate-path", type=Path, required=True)
+    parser.add_argument("--n-jobs", type=n_jobs_arg, default=-1, help="Worker threads, -1 for all cores")
     return parser.parse_args()
 
 
+def load_gps(path: Path) -> pd.DataFrame:
+    if path.suffix.lower() == ".csv":
+        return load_movebank_csv(path)
+    dataset = ds.dataset(path, format="parquet")
+    columns = [column for column in GPS_COLUMNS if column in dataset.schema.names]
+    return dataset.to_table(columns=columns, filter=GPS_FILTER).to_pandas(types_mapper=pd.ArrowDtype)
+
+
 def load_climate(path: Path) -> pd.DataFrame:
-    if path.suffix.lower() in {".nc", ".netcdf"}:
+    # A directory of NetCDF files (e.g. one per month or per variable) is opened lazily as one dataset.
+    if path.is_dir() or path.suffix.lower() in {".nc", ".netcdf"}:
+        # xarray is only loaded for NetCDF inputs.
+        from climate_refugia.data_sources.era5 import era5_to_dataframe
+
         return era5_to_dataframe(path)
-    return pd.read_csv(path)
+    return read_csv(path, column_types=CLIMATE_COLUMN_TYPES)
 
 
 def main() -> None:
     args = parse_args()
-    gps_df = load_movebank_csv(args.gps_path) if args.gps_path.suffix.lower() == ".csv" else pd.read_parquet(args.gps_path)
+    limit_threads(args.n_jobs)
+    gps_df = load_gps(args.gps_path)
     climate_df = load_climate(args.climate_path)
 
     gps_df = clean_gps(gps_df)
     climate_df = clean_climate(climate_df)
 
-    assert_quality(gps_df, climate_df)
+    gps_summary, climate_summary = assert_quality(gps_df, climate_df)
     print("GPS quality summary:")
-    print(gps_quality_summary(gps_df))
+    print(gps_summary)
     print("Climate quality summary:")
-    print(climate_quality_summary(climate_df))
+    print(climate_summary)
 
 
 if __name__ == "__main__":
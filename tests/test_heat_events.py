@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_refugia import heat_events
+from climate_refugia.heat_events import detect_heat_events, label_heat_blocks
+from climate_refugia.utils import ensure_datetime
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def kernel(request, monkeypatch):
+    if request.param == "numba":
+        pytest.importorskip("numba")
+        if heat_events._label_heat_blocks_jit is None:
+            pytest.skip("numba kernel not compiled")
+    else:
+        monkeypatch.setattr(heat_events, "_label_heat_blocks_jit", None)
+    return request.param
+
+
+def _baseline_detect_heat_events(aligned_df, thresholds, default_threshold, heat_window_hours):
+    # The per-individual groupby loop the kernels replaced.
+    df = aligned_df.copy()
+    df["timestamp"] = ensure_datetime(df["timestamp"])
+    df["heat_threshold_c"] = df["species"].map(thresholds).fillna(default_threshold)
+    df["heat_exposure"] = df["temp_c"] >= df["heat_threshold_c"]
+    df = df.sort_values(["individual_id", "timestamp"]).reset_index(drop=True)
+
+    events = []
+    df["heat_event_id"] = pd.NA
+    event_counter = 0
+    for individual_id, group in df.groupby("individual_id"):
+        group = group.sort_values("timestamp")
+        median_dt = group["timestamp"].diff().median()
+        median_seconds = median_dt.total_seconds() if pd.notnull(median_dt) else heat_window_hours * 3600
+        if median_seconds <= 0:
+            median_seconds = heat_window_hours * 3600
+        min_points = max(1, int(math.ceil(heat_window_hours * 3600 / median_seconds)))
+
+        heat_block = (group["heat_exposure"] != group["heat_exposure"].shift()).cumsum()
+        for _, block in group.groupby(heat_block):
+            if not bool(block["heat_exposure"].iloc[0]) or len(block) < min_points:
+                continue
+            event_counter += 1
+            df.loc[block.index, "heat_event_id"] = event_counter
+            events.append({
+                "heat_event_id": event_counter,
+                "individual_id": individual_id,
+                "num_points": len(block),
+                "max_temp_c": block["temp_c"].max(),
+            })
+    return df, pd.DataFrame(events)
+
+
+def _reference_blocks(individual_codes, exposure, min_points):
+    event_ids = np.zeros(len(individual_codes), dtype=np.int64)
+    counter = 0
+    start = 0
+    for idx in range(1, len(individual_codes) + 1):
+        boundary = idx == len(individual_codes) or (
+            individual_codes[idx] != individual_codes[start] or exposure[idx] != exposure[start]
+        )
+        if not boundary:
+            continue
+        if exposure[start] and individual_codes[start] >= 0 and idx - start >= min_points[start]:
+            counter += 1
+            event_ids[start:idx] = counter
+        start = idx
+    return event_ids
+
+
+def _aligned_frame(rng, n):
+    return pd.DataFrame({
+        "individual_id": rng.choice(["a", "b", "c"], n),
+        "species": rng.choice(["elephant", "wildebeest"], n),
+        "timestamp": pd.Timestamp("2020-01-01", tz="UTC") + pd.to_timedelta(rng.permutation(n) * 1800, unit="s"),
+        "temp_c": rng.normal(30, 4, n),
+    })
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_label_heat_blocks_matches_reference(kernel, seed):
+    rng = np.random.default_rng(seed)
+    n = 500
+    codes = np.sort(rng.integers(-1, 4, n))
+    exposure = rng.random(n) < 0.6
+    min_points = rng.integers(1, 4, n).astype(np.float64)
+
+    expected = _reference_blocks(codes, exposure, min_points)
+    np.testing.assert_array_equal(label_heat_blocks(codes, exposure, min_points), expected)
+    np.testing.assert_array_equal(heat_events._label_heat_blocks_vectorized(codes, exposure, min_points), expected)
+
+
+def test_label_heat_blocks_empty(kernel):
+    empty = np.zeros(0, dtype=np.int64)
+    assert len(label_heat_blocks(empty, empty.astype(bool), empty.astype(np.float64))) == 0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_detect_heat_events_matches_baseline(kernel, seed):
+    aligned = _aligned_frame(np.random.default_rng(seed), 300)
+    thresholds = {"elephant": 31.0}
+
+    df, events = detect_heat_events(aligned, thresholds, 29.0, heat_window_hours=2)
+    base_df, base_events = _baseline_detect_heat_events(aligned, thresholds, 29.0, heat_window_hours=2)
+
+    np.testing.assert_array_equal(
+        df["heat_event_id"].fillna(0).to_numpy(dtype=np.int64),
+        pd.to_numeric(base_df["heat_event_id"]).fillna(0).to_numpy(dtype=np.int64),
+    )
+    assert len(events) == len(base_events) > 0
+    pd.testing.assert_frame_equal(
+        events[["heat_event_id", "individual_id", "num_points", "max_temp_c"]],
+        base_events,
+        check_dtype=False,
+    )
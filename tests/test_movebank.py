@@ -0,0 +1,53 @@
+import pandas as pd
+
+from climate_refugia.data_sources.movebank import load_movebank_csv
+
+RAW_CSV = """timestamp,location_lat,location_long,individual_id,individual_local_identifier,taxon_canonical_name,sensor_type_id
+2020-01-01 00:00:00.000,-24.1,31.5,101,E1,Loxodonta africana,653
+2020-01-01 01:00:00.000,-24.2,31.6,101,E1,Loxodonta africana,653
+2020-01-01 00:30:00.000,,31.7,B-7,E2,Loxodonta africana,653
+"""
+
+NORMALIZED_CSV = """timestamp,lat,lon,individual_id,species,study_id,study_name,speed_mps,comments
+2020-01-01 00:00:00+00:00,-24.1,31.5,101,Loxodonta africana,736029750,Kruger,1.5,a
+2020-01-01 01:00:00+00:00,-24.2,31.6,101,Loxodonta africana,736029750,Kruger,,b
+"""
+
+
+def _reference(path, rename):
+    # The pandas reader the loader replaced, restricted to the columns it keeps.
+    df = pd.read_csv(path).rename(columns=rename)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    return df
+
+
+def test_load_raw_movebank_csv(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text(RAW_CSV)
+    df = load_movebank_csv(path)
+
+    expected = _reference(path, {
+        "location_lat": "lat",
+        "location_long": "lon",
+        "individual_local_identifier": "individual_name",
+        "taxon_canonical_name": "species",
+    })
+    assert set(df.columns) == {"timestamp", "lat", "lon", "individual_id", "individual_name", "species"}
+    for column in ("timestamp", "lat", "lon", "individual_name"):
+        pd.testing.assert_series_equal(df[column], expected[column])
+    assert df["individual_id"].astype(str).tolist() == ["101", "101", "B-7"]
+    assert isinstance(df["species"].dtype, pd.CategoricalDtype)
+
+
+def test_load_normalized_csv(tmp_path):
+    path = tmp_path / "normalized.csv"
+    path.write_text(NORMALIZED_CSV)
+    df = load_movebank_csv(path)
+
+    expected = _reference(path, {})
+    assert set(df.columns) == {
+        "timestamp", "lat", "lon", "individual_id", "species", "study_id", "study_name", "speed_mps",
+    }
+    for column in ("timestamp", "lat", "lon", "study_id", "study_name", "speed_mps"):
+        pd.testing.assert_series_equal(df[column], expected[column])
+    assert df["species"].astype(str).tolist() == ["Loxodonta africana"] * 2
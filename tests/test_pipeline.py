@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_refugia.pipeline import _auto_thresholds
+
+
+def _aligned_frame(seed, n=500):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "species": rng.choice(["elephant", "wildebeest", "zebra"], n),
+        "temp_c": rng.normal(30, 4, n).astype(np.float32),
+    })
+    df.loc[rng.choice(n, 10, replace=False), "temp_c"] = np.nan
+    df.loc[rng.choice(n, 5, replace=False), "species"] = None
+    return df
+
+
+@pytest.mark.parametrize("use_polars", [False, True])
+@pytest.mark.parametrize("categorical", [False, True])
+def test_auto_thresholds_matches_groupby_quantile(use_polars, categorical):
+    if use_polars:
+        pytest.importorskip("polars")
+    df = _aligned_frame(0)
+    if categorical:
+        df["species"] = df["species"].astype("category")
+    # The pandas groupby the numpy and polars paths replaced.
+    expected = df.groupby("species", observed=True)["temp_c"].quantile(0.9).to_dict()
+
+    thresholds = _auto_thresholds(df, 0.9, use_polars)
+
+    assert list(thresholds) == sorted(expected)
+    np.testing.assert_allclose([thresholds[key] for key in sorted(expected)], [expected[key] for key in sorted(expected)])
+
+
+def test_auto_thresholds_empty():
+    empty = pd.DataFrame({"species": pd.Series([], dtype=object), "temp_c": pd.Series([], dtype=np.float32)})
+    assert _auto_thresholds(empty, 0.9, use_polars=False) == {}
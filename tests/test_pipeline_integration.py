@@ -1,12 +1,17 @@
 import os
 from pathlib import Path
 
-import pandas as pd
+import pyarrow.dataset as ds
+import pytest
 
 from climate_refugia.config import PipelineConfig
 from climate_refugia.pipeline import run_pipeline
 
 
+@pytest.mark.skipif(
+    "CR_GPS_PATH" not in os.environ or "CR_CLIMATE_PATH" not in os.environ,
+    reason="set CR_GPS_PATH and CR_CLIMATE_PATH to run the end-to-end pipeline",
+)
 def test_pipeline_end_to_end():
     gps_path = Path(os.environ["CR_GPS_PATH"])
     climate_path = Path(os.environ["CR_CLIMATE_PATH"])
@@ -22,5 +27,6 @@ def test_pipeline_end_to_end():
     aligned_path = outputs["aligned_data"]
     assert aligned_path.exists()
 
-    aligned_df = pd.read_parquet(aligned_path)
-    assert {"lat", "lon", "temp_c", "timestamp"}.issubset(set(aligned_df.columns))
+    # Only the schema and tile layout are checked, so no rows are decoded.
+    aligned = ds.dataset(aligned_path, format="parquet", partitioning="hive")
+    assert {"lat", "lon", "temp_c", "timestamp", "tile_x", "tile_y"}.issubset(aligned.schema.names)
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_refugia import preprocessing
+from climate_refugia.preprocessing import align_gps_climate, clean_gps
+from climate_refugia.utils import EARTH_RADIUS_KM, ensure_datetime, haversine_km
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def kernel(request, monkeypatch):
+    if request.param == "numba":
+        pytest.importorskip("numba")
+        if preprocessing._coordinate_mask_jit is None:
+            pytest.skip("numba kernels not compiled")
+    else:
+        monkeypatch.setattr(preprocessing, "_coordinate_mask_jit", None)
+        monkeypatch.setattr(preprocessing, "_fix_mask_jit", None)
+    return request.param
+
+
+def _baseline_clean_gps(gps_df, max_speed_mps=35.0, min_fix_interval_s=30):
+    # The per-individual loop the vectorized speeds replaced.
+    df = gps_df.dropna(subset=["timestamp", "lat", "lon"]).copy()
+    df["timestamp"] = ensure_datetime(df["timestamp"])
+    df = df.dropna(subset=["timestamp"])
+    df = df[(df["lat"].between(-90, 90)) & (df["lon"].between(-180, 180))]
+    df = df.sort_values(["individual_id", "timestamp"]).reset_index(drop=True)
+    df["speed_mps"] = pd.to_numeric(df["speed_mps"], errors="coerce")
+
+    grouped = []
+    for _, group in df.groupby("individual_id", sort=False):
+        distances_km = [np.nan]
+        time_s = [np.nan]
+        for idx in range(1, len(group)):
+            prev = group.iloc[idx - 1]
+            curr = group.iloc[idx]
+            distances_km.append(haversine_km(prev["lat"], prev["lon"], curr["lat"], curr["lon"]))
+            time_s.append((curr["timestamp"] - prev["timestamp"]).total_seconds())
+        group = group.copy()
+        group["_dist_km"] = distances_km
+        group["_dt_s"] = time_s
+        group.loc[group["_dt_s"] <= 0, "_dt_s"] = np.nan
+        group["speed_mps"] = group["speed_mps"].fillna(group["_dist_km"] * 1000 / group["_dt_s"])
+        group = group[(group["_dt_s"].isna()) | (group["_dt_s"] >= min_fix_interval_s)]
+        grouped.append(group.drop(columns=["_dist_km", "_dt_s"]))
+    df = pd.concat(grouped, ignore_index=True)
+    df = df[(df["speed_mps"].isna()) | (df["speed_mps"] <= max_speed_mps)]
+    return df.reset_index(drop=True)
+
+
+def _baseline_align(gps, climate, time_tolerance_minutes=60):
+    # The per-grid-cell merge_asof loop over string keys that the integer-keyed join replaced.
+    from sklearn.neighbors import BallTree
+
+    climate_grid = climate[["lat", "lon"]].drop_duplicates().reset_index(drop=True)
+    tree = BallTree(np.radians(climate_grid.to_numpy()), metric="haversine")
+    dist, idx = tree.query(np.radians(gps[["lat", "lon"]].to_numpy()), k=1)
+    nearest = climate_grid.iloc[idx.flatten()].reset_index(drop=True)
+    gps = gps.reset_index(drop=True)
+    gps["grid_lat"] = nearest["lat"].to_numpy()
+    gps["grid_lon"] = nearest["lon"].to_numpy()
+    gps["grid_distance_km"] = dist.flatten() * EARTH_RADIUS_KM
+    gps["grid_key"] = list(zip(gps["grid_lat"], gps["grid_lon"]))
+    climate = climate.assign(grid_key=list(zip(climate["lat"], climate["lon"])))
+    gps["grid_key"] = gps["grid_key"].astype(str)
+    climate["grid_key"] = climate["grid_key"].astype(str)
+
+    parts = []
+    for grid_key, gps_group in gps.groupby("grid_key"):
+        climate_group = climate[climate["grid_key"] == grid_key]
+        parts.append(pd.merge_asof(
+            gps_group.sort_values("timestamp"),
+            climate_group.sort_values("timestamp"),
+            on="timestamp",
+            direction="nearest",
+            tolerance=pd.Timedelta(minutes=time_tolerance_minutes),
+            suffixes=("", "_climate"),
+        ))
+    aligned = pd.concat(parts, ignore_index=True).drop(columns=["grid_key"])
+    return aligned.dropna(subset=["temp_c"]).reset_index(drop=True)
+
+
+def _gps_frame(rng, n):
+    return pd.DataFrame({
+        "individual_id": rng.choice(["a", "b", "c"], n),
+        "species": rng.choice(["elephant", "wildebeest"], n),
+        "timestamp": pd.Timestamp("2020-01-01", tz="UTC") + pd.to_timedelta(np.sort(rng.integers(0, 86400, n)), unit="s"),
+        "lat": rng.uniform(-24.5, -24.0, n),
+        "lon": rng.uniform(31.0, 31.5, n),
+        "speed_mps": np.where(rng.random(n) < 0.2, rng.uniform(0, 50, n), np.nan),
+    })
+
+
+def _climate_frame():
+    grid = [(lat, lon) for lat in (-24.5, -24.25, -24.0) for lon in (31.0, 31.25, 31.5)]
+    times = pd.date_range("2020-01-01", periods=24, freq="h", tz="UTC")
+    rows = [(time, lat, lon) for time in times for lat, lon in grid]
+    climate = pd.DataFrame(rows, columns=["timestamp", "lat", "lon"])
+    climate["temp_c"] = np.random.default_rng(0).normal(30, 4, len(climate))
+    return climate
+
+
+def _sorted(df):
+    return df.sort_values(["individual_id", "timestamp", "lat"]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_clean_gps_matches_baseline(kernel, seed):
+    gps = _gps_frame(np.random.default_rng(seed), 400)
+    gps.loc[:4, "lat"] = [np.nan, 95.0, -91.0, 10.0, 10.0]
+    gps.loc[3:4, "lon"] = [200.0, np.nan]
+
+    cleaned = clean_gps(gps)
+    expected = _baseline_clean_gps(gps)
+
+    assert isinstance(cleaned["individual_id"].dtype, pd.CategoricalDtype)
+    assert cleaned["lat"].dtype == np.float32
+    pd.testing.assert_frame_equal(
+        cleaned.astype({"individual_id": object, "species": object}),
+        expected,
+        check_dtype=False,
+        rtol=1e-5,
+    )
+
+
+@pytest.mark.parametrize("use_polars", [False, True])
+def test_align_gps_climate_matches_baseline(use_polars):
+    if use_polars:
+        pytest.importorskip("polars")
+    gps = clean_gps(_gps_frame(np.random.default_rng(1), 300))
+    climate = _climate_frame()
+
+    aligned = align_gps_climate(gps, climate, time_tolerance_minutes=20, use_polars=use_polars)
+    expected = _baseline_align(gps, climate, time_tolerance_minutes=20)
+
+    assert 0 < len(aligned) < len(gps)
+    # The baseline took radians of the float32 coordinates, so its grid distances carry float32 rounding.
+    pd.testing.assert_frame_equal(_sorted(aligned), _sorted(expected)[aligned.columns], rtol=1e-4)
@@ -0,0 +1,137 @@
+import builtins
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from climate_refugia import utils
+from climate_refugia.utils import (
+    batch_haversine_km,
+    haversine_km,
+    haversine_km_vec,
+    rolling_groups,
+    write_spatial_dataset,
+)
+
+
+def _baseline_rolling_groups(sorted_times, max_gap_seconds):
+    # The per-row loop rolling_groups replaced.
+    group_ids = [0]
+    for idx in range(1, len(sorted_times)):
+        gap = (sorted_times.iloc[idx] - sorted_times.iloc[idx - 1]).total_seconds()
+        group_ids.append(group_ids[-1] + int(gap > max_gap_seconds))
+    return group_ids
+
+
+def _coordinates(seed, n=200):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-90, 90, n), rng.uniform(-180, 180, n)
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def rolling_kernel(request, monkeypatch):
+    if request.param == "numba":
+        pytest.importorskip("numba")
+    else:
+        monkeypatch.setattr(utils, "_rolling_groups_jit", lambda: None)
+    return request.param
+
+
+@pytest.fixture(params=["numexpr", "numpy"])
+def haversine_backend(request, monkeypatch):
+    if request.param == "numexpr":
+        pytest.importorskip("numexpr")
+    else:
+        real_import = builtins.__import__
+
+        def no_numexpr(name, *args, **kwargs):
+            if name == "numexpr":
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", no_numexpr)
+    return request.param
+
+
+def test_haversine_km_vec_matches_scalar():
+    lat1, lon1 = _coordinates(0)
+    lat2, lon2 = _coordinates(1)
+    expected = [haversine_km(*point) for point in zip(lat1, lon1, lat2, lon2)]
+    np.testing.assert_allclose(haversine_km_vec(lat1, lon1, lat2, lon2), expected, rtol=1e-12)
+    # float32 storage is upcast before computing, so it only loses the input rounding.
+    np.testing.assert_allclose(
+        haversine_km_vec(lat1.astype(np.float32), lon1.astype(np.float32), lat2, lon2), expected, rtol=1e-5, atol=1e-3
+    )
+
+
+def test_batch_haversine_km_matches_scalar(haversine_backend):
+    lat, lon = _coordinates(2)
+    expected = [haversine_km(-24.0, 31.5, point_lat, point_lon) for point_lat, point_lon in zip(lat, lon)]
+    np.testing.assert_allclose(batch_haversine_km(lat, lon, -24.0, 31.5), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_rolling_groups_matches_baseline(rolling_kernel, seed):
+    rng = np.random.default_rng(seed)
+    offsets = np.cumsum(rng.choice([60, 600, 7200, 0], 300))
+    times = pd.Series(pd.Timestamp("2020-01-01", tz="UTC") + pd.to_timedelta(offsets, unit="s"))
+    times.iloc[rng.choice(len(times), 5, replace=False)] = pd.NaT
+
+    assert rolling_groups(times, 3600) == _baseline_rolling_groups(times, 3600)
+
+
+def test_rolling_groups_short_inputs(rolling_kernel):
+    assert rolling_groups(pd.Series([], dtype="datetime64[ns, UTC]"), 60) == [0]
+    assert rolling_groups(pd.Series([pd.Timestamp("2020-01-01", tz="UTC")]), 60) == [0]
+
+
+def _points(n=50):
+    lat, lon = _coordinates(3, n)
+    return pd.DataFrame({"lat": lat, "lon": lon, "value": np.arange(n)})
+
+
+def test_write_spatial_dataset_roundtrip(tmp_path):
+    df = _points()
+    root = tmp_path / "points"
+    write_spatial_dataset(df, root, tile_deg=30.0)
+
+    table = ds.dataset(root, format="parquet", partitioning="hive").to_table().to_pandas()
+    table = table.sort_values("value").reset_index(drop=True)
+    pd.testing.assert_frame_equal(table[["lat", "lon", "value"]], df)
+    np.testing.assert_array_equal(table["tile_x"], np.floor((df["lon"] + 180) / 30).astype(np.int32))
+    np.testing.assert_array_equal(table["tile_y"], np.floor((df["lat"] + 90) / 30).astype(np.int32))
+
+
+def test_write_spatial_dataset_replaces_previous_tiles(tmp_path):
+    root = tmp_path / "points"
+    write_spatial_dataset(_points(), root, tile_deg=30.0)
+    write_spatial_dataset(_points(5), root, tile_deg=30.0)
+
+    assert ds.dataset(root, format="parquet", partitioning="hive").count_rows() == 5
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["points"]
+
+
+def test_write_spatial_dataset_empty(tmp_path):
+    root = tmp_path / "points"
+    write_spatial_dataset(_points().iloc[:0], root, tile_deg=30.0)
+
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    assert dataset.count_rows() == 0
+    assert {"lat", "lon", "value", "tile_x", "tile_y"}.issubset(dataset.schema.names)
+
+
+def test_write_spatial_dataset_refuses_foreign_paths(tmp_path):
+    foreign_dir = tmp_path / "outputs"
+    foreign_dir.mkdir()
+    (foreign_dir / "notes.txt").write_text("keep")
+    foreign_file = tmp_path / "aligned.parquet"
+    foreign_file.write_text("keep")
+
+    for root in (foreign_dir, foreign_file):
+        with pytest.raises(FileExistsError):
+            write_spatial_dataset(_points(), root, tile_deg=30.0)
+    assert (foreign_dir / "notes.txt").read_text() == "keep"
+    assert foreign_file.read_text() == "keep"
+    with pytest.raises(ValueError):
+        write_spatial_dataset(_points(), tmp_path / "points", tile_deg=0)